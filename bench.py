@@ -0,0 +1,567 @@
+"""
+Micro-benchmarks for the report pipeline. Run with:
+
+    PYTHONPATH=python python bench.py [name ...]
+"""
+import random
+import sys
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def timeit(func, repeat=5):
+    """
+    Best wall time of repeat runs, in milliseconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+class _BenchHandler(BaseHTTPRequestHandler):
+    """
+    Keep-alive handler for local benchmark servers; subclasses only supply do_GET
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(handler_cls, ssl_context=None):
+    """
+    Serve handler_cls on a free loopback port from a daemon thread, over TLS when ssl_context
+    is given. Returns the server, to shut down afterwards, and its base URL ending in "/".
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+    server.daemon_threads = True
+    scheme = "http"
+    if ssl_context is not None:
+        server.socket = ssl_context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_port}/"
+
+
+def bench_forecast():
+    from forecast import forecast_month_end
+
+    today = date(2026, 10, 19)
+    start_date = today - timedelta(days=35)
+    rng = random.Random(42)
+    series = {
+        f"service-{i}": array('q', (rng.randrange(100_000_000) for _ in range(35)))
+        for i in range(5000)
+    }
+    ms = timeit(lambda: forecast_month_end(series, start_date, today))
+    return f"5,000 series x 35 days: {ms:.1f} ms (target < 100 ms)"
+
+
+def bench_money():
+    import math
+
+    from money import parse_micros
+
+    rng = random.Random(42)
+    amounts = [f"{rng.random() * 1000:.10f}" for _ in range(100_000)]
+    floats = [float(amount) for amount in amounts]
+    micros = list(map(parse_micros, amounts))
+    packed = array('q', micros)
+    parse_ms = timeit(lambda: list(map(parse_micros, amounts)))
+    float_ms = timeit(lambda: list(map(float, amounts)))
+    return (
+        f"parse 100k amounts: {parse_ms:.1f} ms (float(): {float_ms:.1f} ms); "
+        f"sum floats (inexact): {timeit(lambda: sum(floats)):.2f} ms, "
+        f"math.fsum (exact): {timeit(lambda: math.fsum(floats)):.2f} ms, "
+        f"sum micros: {timeit(lambda: sum(micros)):.2f} ms, "
+        f"sum micros array('q'): {timeit(lambda: sum(packed)):.2f} ms"
+    )
+
+
+ROUTER_EVENTS = {
+    "task": {"task": "budget-check"},
+    "scheduled": {"source": "aws.events", "detail-type": "Scheduled Event", "detail": {}},
+    "url_verification": {
+        "path": "/slack-events",
+        "headers": {"Content-Type": "application/json"},
+        "body": '{"token": "t", "challenge": "abc", "type": "url_verification"}',
+    },
+    "slash_command": {
+        "path": "/slack-events",
+        "headers": {"X-Slack-Signature": "v0=1", "Content-Type": "application/x-www-form-urlencoded"},
+        "body": "token=t&team_id=T1&command=%2Fbills&text=public&response_url=https%3A%2F%2Fhooks.slack.com",
+    },
+    "slack_event": {
+        "path": "/slack-events",
+        "headers": {"X-Slack-Signature": "v0=1", "Content-Type": "application/json"},
+        "body": '{"type": "event_callback", "event": {"type": "app_mention", "text": "<@U1> bills"}}',
+    },
+    "manual": {"path": "/slack-events", "headers": {}, "body": None},
+    "unsupported": {"foo": "bar"},
+}
+
+
+def bench_router():
+    from router import classify
+
+    results = []
+    for name, event in ROUTER_EVENTS.items():
+        route = classify(event)[0]
+        us = timeit(lambda: [classify(event) for _ in range(10_000)]) / 10
+        results.append(f"{name} -> {route}: {us:.2f} us")
+    return "; ".join(results)
+
+
+def bench_requests_text():
+    import requests
+    from requests.compat import chardet
+    from requests.utils import _detected_encodings
+
+    utf8 = '{"service": "Amazon Relational Database Service", "region": "São Paulo"}\n'.encode() * 40_000
+    legacy = "Счёт за облачные услуги за октябрь. ".encode("cp1251") * 60_000
+
+    def text(body):
+        response = requests.Response()
+        response._content = body
+        response.encoding = None
+        response.url = "https://reports.example.com/costs"
+        response.headers["Content-Type"] = "text/plain"
+        return response.text
+
+    chardet.detect("warm up é".encode())
+    full = timeit(lambda: chardet.detect(legacy), repeat=1)
+    _detected_encodings.clear()
+    first = timeit(lambda: text(legacy), repeat=1)
+    cached = timeit(lambda: text(legacy))
+    return (
+        f"{len(utf8) / 2**20:.1f} MB UTF-8 {timeit(lambda: text(utf8)):.1f} ms; "
+        f"{len(legacy) / 2**20:.1f} MB cp1251: detection over the whole body {full:.0f} ms, "
+        f"sampled {first:.0f} ms, cached for the host {cached:.1f} ms"
+    )
+
+
+def bench_warmup():
+    import os
+    import shutil
+    import ssl
+    import subprocess
+    import tempfile
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    from warmup import warm_http
+
+    class Handler(_BenchHandler):
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+
+        def do_GET(self):
+            self.do_HEAD()
+            self.wfile.write(b"ok")
+
+    workdir = tempfile.mkdtemp()
+    cert = os.path.join(workdir, "cert.pem")
+    try:
+        # Self-signed certificate so the first request pays for a real TLS handshake
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+             "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+             "-keyout", cert, "-out", cert],
+            check=True, capture_output=True,
+        )
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert)
+        scheme = "https"
+    except (OSError, subprocess.CalledProcessError):
+        context, cert, scheme = None, True, "http"
+    server, url = _serve(Handler, context)
+
+    def new_session():
+        session = requests.Session()
+        session.trust_env = False
+        session.verify = cert
+        session.mount(f"{scheme}://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return session
+
+    def first_request(warm):
+        session = new_session()
+        if warm:
+            warm_http([url], session)
+        started = time.perf_counter()
+        session.get(url).close()
+        elapsed = time.perf_counter() - started
+        session.close()
+        return elapsed * 1000
+
+    try:
+        cold = min(first_request(False) for _ in range(20))
+        warm = min(first_request(True) for _ in range(20))
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    # Loopback has no DNS lookup or network round trips, so real hosts save considerably more
+    return f"first {scheme} request on loopback: cold {cold:.2f} ms, after warm-up {warm:.2f} ms"
+
+
+def bench_pipeline():
+    from currency import FALLBACK_RATES, CurrencyTable
+    from pipeline import ReportPipeline, load_report_config
+
+    today = date(2026, 10, 19)
+    rng = random.Random(42)
+    rows = [
+        ((today - timedelta(days=day)).isoformat(), (f"service-{i}",), rng.randrange(100_000_000))
+        for day in range(36) for i in range(300)
+    ]
+    results = []
+    for style in ("bill_cycle", "detailed", "console"):
+        pipeline = ReportPipeline(
+            None, load_report_config(style=style), fetch=lambda ce_client, config, end_date: rows,
+            currency_table=CurrencyTable(FALLBACK_RATES)
+        )
+        ms = timeit(lambda: pipeline.run(["INR"], end_date=today))
+        stages = ", ".join(f"{stage} {value:.1f}" for stage, value in pipeline.timings.items() if stage != "total")
+        results.append(f"{style} {ms:.1f} ms ({stages})")
+    return f"300 services x 36 days: {'; '.join(results)}"
+
+
+def bench_requests_content():
+    import tracemalloc
+
+    import requests
+
+    # A cost report sized download, 8 MB with a Content-Length
+    body = b"2026-10-01,Amazon Elastic Compute Cloud - Compute,12.345678\n" * 140_000
+
+    class Handler(_BenchHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server, url = _serve(Handler)
+    session = requests.Session()
+    session.trust_env = False
+
+    def chunked():
+        response = session.get(url, stream=True)
+        return b"".join(response.iter_content(requests.models.CONTENT_CHUNK_SIZE))
+
+    def content():
+        return session.get(url).content
+
+    def peak_mb(func):
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak / 2**20
+
+    try:
+        results = (
+            f"{len(body) / 2**20:.1f} MB body: joined chunks {timeit(chunked):.1f} ms, "
+            f"peak {peak_mb(chunked):.1f} MB; content {timeit(content):.1f} ms, peak {peak_mb(content):.1f} MB"
+        )
+    finally:
+        session.close()
+        server.shutdown()
+    return results
+
+
+def bench_requests_headers():
+    import requests
+    from requests.sessions import merge_setting
+    from requests.structures import CaseInsensitiveDict
+    from urllib3 import HTTPHeaderDict
+
+    session = requests.Session()
+    session.headers["Authorization"] = "Bearer xoxb-test"
+    request_headers = {"Content-Type": "application/json; charset=utf-8"}
+    response_headers = HTTPHeaderDict({
+        "Content-Type": "application/json; charset=utf-8",
+        "Content-Length": "1234",
+        "Connection": "keep-alive",
+        "Date": "Mon, 19 Oct 2026 09:00:00 GMT",
+        "Cache-Control": "private, no-cache, no-store, must-revalidate",
+        "X-Slack-Req-Id": "b5a0c0ffee",
+        "Vary": "Accept-Encoding",
+        "Access-Control-Allow-Origin": "*",
+    })
+
+    def request_cycle():
+        # What one request does with headers: merge, prepare, copy, response, lookups
+        merged = merge_setting(request_headers, session.headers, dict_class=CaseInsensitiveDict)
+        prepared = requests.PreparedRequest()
+        prepared.prepare_headers(merged)
+        prepared.headers.copy()
+        headers = CaseInsensitiveDict(response_headers)
+        headers.get("content-type")
+        headers.get("content-encoding")
+        "location" in headers
+        return headers
+
+    per_request = timeit(lambda: [request_cycle() for _ in range(10_000)]) / 10
+    return f"header handling per request {per_request:.1f} us"
+
+
+def bench_requests_json():
+    import json
+    import tracemalloc
+
+    import requests
+
+    # A conversation history sized Slack response, about 11 MB
+    message = {"type": "message", "user": "U0123", "text": "AWS bill " * 20, "ts": "1760000000.000100"}
+    body = json.dumps({"ok": True, "messages": [message] * 50_000, "has_more": False}).encode()
+
+    class Handler(_BenchHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server, url = _serve(Handler)
+    session = requests.Session()
+    session.trust_env = False
+
+    def whole():
+        return sum(len(m["text"]) for m in session.get(url).json()["messages"])
+
+    def streamed():
+        with session.get(url, stream=True) as response:
+            return sum(len(m["text"]) for m in response.iter_json("messages"))
+
+    def peak_mb(func):
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak / 2**20
+
+    try:
+        results = (
+            f"{len(body) / 2**20:.1f} MB body: json() {timeit(whole, repeat=3):.0f} ms, peak {peak_mb(whole):.1f} MB; "
+            f"iter_json() {timeit(streamed, repeat=3):.0f} ms, peak {peak_mb(streamed):.2f} MB"
+        )
+    finally:
+        session.close()
+        server.shutdown()
+    return results
+
+
+def bench_requests_lines():
+    import io
+
+    import requests
+
+    ndjson = b'{"date":"2026-10-01","service":"Amazon EC2","amount_usd":"12.345678"}\n' * 20_000
+    one_line = b"x" * 2_000_000
+
+    def iter_lines_ms(body):
+        def run():
+            response = requests.Response()
+            response.raw = io.BytesIO(body)
+            for _ in response.iter_lines():
+                pass
+        return timeit(run, repeat=10)
+
+    return f"1.4 MB NDJSON {iter_lines_ms(ndjson):.1f} ms, one 2 MB line {iter_lines_ms(one_line):.1f} ms"
+
+
+def bench_requests_cookies():
+    import http.client
+    import io
+    from types import SimpleNamespace
+
+    import requests
+    from requests.cookies import RequestsCookieJar, extract_cookies_to_jar
+
+    prepared = requests.Request("POST", "https://slack.com/api/chat.postMessage").prepare()
+    headers = http.client.parse_headers(io.BytesIO(
+        b"Content-Type: application/json; charset=utf-8\r\nContent-Length: 1234\r\n"
+        b"Cache-Control: private, no-cache\r\nX-Slack-Req-Id: b5a0c0ffee\r\n\r\n"
+    ))
+    raw = SimpleNamespace(_original_response=SimpleNamespace(msg=headers))
+    session_jar, response_jar = RequestsCookieJar(), RequestsCookieJar()
+
+    def request_cycle():
+        # Cookie work of one request without cookies: the Cookie header, then the adapter's
+        # and the session's extraction from the response
+        prepared.prepare_cookies(session_jar)
+        extract_cookies_to_jar(response_jar, prepared, raw)
+        extract_cookies_to_jar(session_jar, prepared, raw)
+
+    jar = RequestsCookieJar()
+    for domain in range(30):
+        for name in range(10):
+            jar.set(f"cookie{name}", "v", domain=f"team{domain}.example.com", path="/")
+    jar.set("d", "token", domain="slack.com", path="/")
+
+    per_request = timeit(lambda: [request_cycle() for _ in range(1_000)])
+    lookup = timeit(lambda: [jar.get("cookie5", domain="team7.example.com") for _ in range(1_000)])
+    by_name = timeit(lambda: [jar["d"] for _ in range(1_000)])
+    return (
+        f"empty jar: {per_request:.1f} us per request; 301 cookies: get with domain {lookup:.1f} us, "
+        f"jar[name] {by_name:.1f} us"
+    )
+
+
+def bench_requests_env():
+    import requests
+    from requests.utils import get_environ_proxies, get_netrc_auth
+
+    session = requests.Session()
+    url = "https://ce.us-east-1.amazonaws.com/"
+    request = requests.Request("GET", url)
+    uncached_ms = timeit(lambda: [(get_environ_proxies(url), get_netrc_auth(url)) for _ in range(10_000)])
+    cached_ms = timeit(lambda: [
+        (session.merge_environment_settings(url, {}, None, None, None), session.prepare_request(request))
+        for _ in range(10_000)
+    ])
+    prepare_ms = timeit(lambda: [session.prepare_request(request) for _ in range(10_000)])
+    return (
+        f"per request: proxy + netrc lookups uncached {uncached_ms / 10:.1f} us; "
+        f"merge_environment_settings + prepare_request {cached_ms / 10:.1f} us "
+        f"(prepare_request alone {prepare_ms / 10:.1f} us)"
+    )
+
+
+def bench_requests_template():
+    import requests
+
+    session = requests.Session()
+    session.headers["Authorization"] = "Bearer xoxb-test"
+    url = "https://slack.com/api/chat.postMessage"
+    payload = {"channel": "C0123", "text": "AWS bill"}
+    template = session.template("POST", url)
+
+    def prepare_ms():
+        return timeit(lambda: [session.prepare_request(requests.Request("POST", url, json=payload))
+                               for _ in range(10_000)]) / 10
+
+    def template_ms():
+        return timeit(lambda: [template.prepare(json=payload) for _ in range(10_000)]) / 10
+
+    results = [f"prepare_request {prepare_ms():.1f} us, template {template_ms():.1f} us"]
+    session.cookies.set("d", "token", domain="slack.com")
+    results.append(f"with a cookie: prepare_request {prepare_ms():.1f} us, template {template_ms():.1f} us")
+    return "; ".join(results)
+
+
+def bench_requests_batch():
+
+    import requests
+
+    class Handler(_BenchHandler):
+        def do_GET(self):
+            # Stands in for an API's response time
+            time.sleep(0.02)
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+    server, base = _serve(Handler)
+    urls = [f"{base}{i}" for i in range(20)]
+    session = requests.Session()
+    session.trust_env = False
+
+    def sequential():
+        for url in urls:
+            session.get(url).close()
+
+    def batch():
+        for response in session.map(requests.Request("GET", url) for url in urls):
+            response.close()
+
+    try:
+        results = f"20 requests: sequential {timeit(sequential):.1f} ms, batch {timeit(batch):.1f} ms"
+    finally:
+        session.close()
+        server.shutdown()
+    return results
+
+
+def bench_requests_cache():
+    import json
+
+    import requests
+    from requests.caching import CachingHTTPAdapter
+
+    body = json.dumps({"conversion_rates": {f"C{i:03d}": i / 7 for i in range(3000)}}).encode()
+
+    class Handler(_BenchHandler):
+        def do_GET(self):
+            # Stands in for the rates API's response time
+            time.sleep(0.02)
+            fresh = self.path == "/fresh"
+            if self.headers.get("If-None-Match") == '"rates"':
+                self.send_response(304)
+                self.send_header("ETag", '"rates"')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Cache-Control", "max-age=3600" if fresh else "no-cache")
+            self.send_header("ETag", '"rates"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server, base = _serve(Handler)
+    plain, cached = requests.Session(), requests.Session()
+    plain.trust_env = cached.trust_env = False
+    cached.mount("http://", CachingHTTPAdapter())
+
+    def fetch(session, path):
+        return lambda: [session.get(base + path).json() for _ in range(10)]
+
+    try:
+        results = (
+            f"{len(body) // 1024} KB body, per request: uncached {timeit(fetch(plain, 'fresh')) / 10:.2f} ms, "
+            f"revalidated (304) {timeit(fetch(cached, 'revalidate')) / 10:.2f} ms, "
+            f"fresh from cache {timeit(fetch(cached, 'fresh')) / 10:.2f} ms"
+        )
+    finally:
+        plain.close()
+        cached.close()
+        server.shutdown()
+    return results
+
+
+BENCHMARKS = {
+    "forecast": bench_forecast,
+    "money": bench_money,
+    "router": bench_router,
+    "pipeline": bench_pipeline,
+    "requests_batch": bench_requests_batch,
+    "requests_cache": bench_requests_cache,
+    "requests_content": bench_requests_content,
+    "requests_cookies": bench_requests_cookies,
+    "requests_env": bench_requests_env,
+    "requests_headers": bench_requests_headers,
+    "requests_json": bench_requests_json,
+    "requests_lines": bench_requests_lines,
+    "requests_template": bench_requests_template,
+    "requests_text": bench_requests_text,
+    "warmup": bench_warmup,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"{name}: {BENCHMARKS[name]()}")
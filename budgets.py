@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+from array import array
+from datetime import datetime, timedelta
+
+from cache import get_cache, make_key
+from costs import DAILY_HISTORY_DAYS, SERVICE_GROUP, cached_daily_rows
+from forecast import daily_series, forecast_month_end, total_series
+from money import format_money, parse_micros
+
+logger = logging.getLogger()
+
+ANY_SERVICE = "*"
+TOTAL = "TOTAL"
+# Breaches are posted once per rule, service and day
+ALERT_DEDUPE_TTL = 2 * 24 * 3600
+
+# Example BUDGET_RULES value:
+# [
+#   {"type": "daily_cap", "service": "Amazon Elastic Compute Cloud - Compute", "limit": 40},
+#   {"type": "daily_cap", "service": "*", "limit": 10},
+#   {"type": "monthly_forecast", "service": "TOTAL", "limit": 900},
+#   {"type": "day_over_day", "service": "*", "percent": 50, "min_cost": 1}
+# ]
+# "*" applies a rule to every service without a more specific rule of the same type,
+# "TOTAL" applies it to the sum over all services.
+
+
+def load_budget_rules():
+    """
+    Read budget rules from BUDGET_RULES (JSON) or BUDGET_RULES_FILE
+    """
+    raw = os.environ.get("BUDGET_RULES")
+    path = os.environ.get("BUDGET_RULES_FILE")
+    if not raw and path:
+        with open(path) as f:
+            raw = f.read()
+    return json.loads(raw) if raw else []
+
+
+class CompiledRules:
+    """
+    Rules folded into one lookup table per rule type, keyed by service, with amounts in
+    micro-dollars. Evaluation is a single
+    pass over the services with dict lookups, so cost grows with services, not rules x services.
+    When several rules target the same service and type, the strictest one wins.
+    """
+
+    def __init__(self, rules):
+        self.daily_caps = {}
+        self.forecast_limits = {}
+        self.growth = {}
+        for rule in rules:
+            rule_type = rule['type']
+            service = rule.get('service', ANY_SERVICE)
+            if rule_type == "daily_cap":
+                self._keep_lowest(self.daily_caps, service, parse_micros(str(rule['limit'])))
+            elif rule_type == "monthly_forecast":
+                self._keep_lowest(self.forecast_limits, service, parse_micros(str(rule['limit'])))
+            elif rule_type == "day_over_day":
+                threshold = (1 + float(rule['percent']) / 100, parse_micros(str(rule.get('min_cost', 0))))
+                self._keep_lowest(self.growth, service, threshold)
+            else:
+                raise ValueError(f"Unknown budget rule type: {rule_type}")
+
+    @staticmethod
+    def _keep_lowest(table, service, value):
+        if service not in table or value < table[service]:
+            table[service] = value
+
+    def __bool__(self):
+        return bool(self.daily_caps or self.forecast_limits or self.growth)
+
+    def evaluate(self, states):
+        """
+        states maps service (or TOTAL) to (today, yesterday, projected month end).
+        Returns a list of (rule type, service, value, limit) for every breach.
+        """
+        breaches = []
+        daily_caps, forecast_limits, growth = self.daily_caps, self.forecast_limits, self.growth
+        any_cap = daily_caps.get(ANY_SERVICE)
+        any_forecast = forecast_limits.get(ANY_SERVICE)
+        any_growth = growth.get(ANY_SERVICE)
+        for service, (today, yesterday, projected) in states.items():
+            is_total = service == TOTAL
+            cap = daily_caps.get(service, None if is_total else any_cap)
+            if cap is not None and today > cap:
+                breaches.append(("daily_cap", service, today, cap))
+            limit = forecast_limits.get(service, None if is_total else any_forecast)
+            if limit is not None and projected > limit:
+                breaches.append(("monthly_forecast", service, projected, limit))
+            threshold = growth.get(service, None if is_total else any_growth)
+            if threshold is not None and yesterday > 0 and today >= threshold[1] and today > yesterday * threshold[0]:
+                breaches.append(("day_over_day", service, today, yesterday))
+        return breaches
+
+
+def daily_states(rows, today):
+    """
+    Build {service: (today, yesterday, projected month end)} from DAILY rows grouped by SERVICE,
+    plus a TOTAL entry. Projections come from the local forecast over the complete days.
+    """
+    history_start = today - timedelta(days=DAILY_HISTORY_DAYS)
+    days = DAILY_HISTORY_DAYS
+    # One slot per complete day plus today's partial costs in the last slot
+    series = daily_series(rows, history_start, today + timedelta(days=1))
+    complete = {service: values[:days] for service, values in series.items()}
+    complete[TOTAL] = total_series(complete, days)
+    series[TOTAL] = complete[TOTAL] + array('q', [sum(values[days] for values in series.values())])
+    forecasts = forecast_month_end(complete, history_start, today)
+    return {
+        service: (values[days], values[days - 1], forecasts[service].projected)
+        for service, values in series.items()
+    }
+
+
+def format_breach(breach):
+    rule_type, service, value, limit = breach
+    value_text, limit_text = format_money(round(value)), format_money(round(limit))
+    if rule_type == "daily_cap":
+        return f"🚨 *{service}* spent {value_text} today, over the daily cap of {limit_text}"
+    if rule_type == "monthly_forecast":
+        return f"📈 *{service}* is on track for {value_text} this month, over the budget of {limit_text}"
+    growth = (value / limit - 1) * 100
+    return f"⚠️ *{service}* spend grew {growth:,.0f}% day over day ({limit_text} → {value_text})"
+
+
+class BudgetMonitor:
+    """
+    Evaluates budget rules each time fresh DAILY per-service costs are ingested and posts only
+    new breaches. Services whose today/yesterday/month-to-date figures did not change since the
+    last ingest are skipped.
+    """
+
+    def __init__(self, rules, notify):
+        self.rules = CompiledRules(rules)
+        self.notify = notify
+        self._last_states = {}
+
+    def on_ingest(self, rows, granularity, group_by):
+        if not self.rules or granularity != 'DAILY' or group_by != [SERVICE_GROUP]:
+            return []
+        today = datetime.now().date()
+        states = daily_states(rows, today)
+        changed = {
+            service: state for service, state in states.items()
+            if self._last_states.get(service) != state
+        }
+        self._last_states.update(changed)
+        if not changed:
+            return []
+
+        cache = get_cache()
+        new_breaches = []
+        for breach in self.rules.evaluate(changed):
+            key = make_key("budget-alert", breach[0], breach[1], today)
+            if cache.get(key) is None:
+                cache.set(key, True, ALERT_DEDUPE_TTL)
+                new_breaches.append(breach)
+        logger.info(f"Budget check: {len(changed)} changed series, {len(new_breaches)} new breaches")
+        if new_breaches:
+            self.notify("*💸 BUDGET ALERTS*\n\n" + "\n".join(format_breach(b) for b in new_breaches))
+        return new_breaches
+
+
+def ingest_daily_costs(ce_client, today=None):
+    """
+    Pull the shared DAILY history through the cache, which runs the ingest listeners when the
+    data is fresh
+    """
+    return cached_daily_rows(ce_client, today)
@@ -0,0 +1,298 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger()
+
+MEMORY_MAX_ENTRIES = int(os.environ.get("CACHE_MEMORY_ENTRIES", "256"))
+CACHE_DIR = os.environ.get("CACHE_DIR", "/tmp/lambda-billing-cache")
+
+
+class CacheTier:
+    """
+    Base class for a cache tier. Values must be JSON serialisable; expires_at is a unix timestamp.
+    Subclasses implement _get/_set/_delete, this class keeps hit, miss and latency counters.
+    """
+
+    name = "tier"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    def get(self, key):
+        """
+        Return (value, expires_at) or None
+        """
+        started = time.perf_counter()
+        try:
+            entry = self._get(key)
+        except Exception as e:
+            logger.error(f"Error reading {self.name} cache: {str(e)}", exc_info=True)
+            self.errors += 1
+            entry = None
+        self.seconds += time.perf_counter() - started
+        if entry is not None and entry[1] <= time.time():
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key, value, expires_at):
+        started = time.perf_counter()
+        try:
+            self._set(key, value, expires_at)
+        except Exception as e:
+            logger.error(f"Error writing {self.name} cache: {str(e)}", exc_info=True)
+            self.errors += 1
+        self.seconds += time.perf_counter() - started
+
+    def delete(self, key):
+        try:
+            self._delete(key)
+        except Exception as e:
+            logger.error(f"Error deleting from {self.name} cache: {str(e)}", exc_info=True)
+            self.errors += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'avg_ms': round(self.seconds * 1000 / lookups, 3) if lookups else 0.0
+        }
+
+
+class MemoryCache(CacheTier):
+    """
+    Per-container LRU, values are shared by reference and must not be mutated by callers
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class FileCache(CacheTier):
+    """
+    JSON files under /tmp, which survives between invocations of the same execution environment
+    """
+
+    name = "file"
+
+    def __init__(self, directory=CACHE_DIR):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def _get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        if entry['expires_at'] <= time.time():
+            os.remove(path)
+            return None
+        return entry['value'], entry['expires_at']
+
+    def _set(self, key, value, expires_at):
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temp_path, "w") as f:
+            json.dump({'key': key, 'value': value, 'expires_at': expires_at}, f)
+        os.replace(temp_path, path)
+
+    def _delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class SharedCache(CacheTier):
+    """
+    Cross-instance tier on a DynamoDB table with a string partition key "key".
+    expires_at can be enabled as the table's TTL attribute so stale items are purged.
+    """
+
+    name = "shared"
+
+    def __init__(self, client, table_name):
+        super().__init__()
+        self.client = client
+        self.table_name = table_name
+
+    def _get(self, key):
+        item = self.client.get_item(
+            TableName=self.table_name,
+            Key={'key': {'S': key}},
+            ConsistentRead=False
+        ).get('Item')
+        if item is None:
+            return None
+        return json.loads(item['value']['S']), float(item['expires_at']['N'])
+
+    def _set(self, key, value, expires_at):
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'key': {'S': key},
+                'value': {'S': json.dumps(value)},
+                'expires_at': {'N': str(int(expires_at))}
+            }
+        )
+
+    def _delete(self, key):
+        self.client.delete_item(TableName=self.table_name, Key={'key': {'S': key}})
+
+
+class SQLiteDynamoClient:
+    """
+    Local stand-in for the subset of the boto3 DynamoDB client used by SharedCache
+    (get_item, put_item, delete_item on tables keyed by a string "key" attribute)
+    """
+
+    def __init__(self, path=":memory:"):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._tables = set()
+
+    def _table(self, name):
+        if name not in self._tables:
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" (key TEXT PRIMARY KEY, item TEXT NOT NULL)'
+            )
+            self._tables.add(name)
+        return f'"{name}"'
+
+    def get_item(self, TableName, Key, **kwargs):
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT item FROM {self._table(TableName)} WHERE key = ?", (Key['key']['S'],)
+            ).fetchone()
+        return {'Item': json.loads(row[0])} if row else {}
+
+    def put_item(self, TableName, Item, **kwargs):
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self._table(TableName)} (key, item) VALUES (?, ?)",
+                (Item['key']['S'], json.dumps(Item))
+            )
+        return {}
+
+    def delete_item(self, TableName, Key, **kwargs):
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"DELETE FROM {self._table(TableName)} WHERE key = ?", (Key['key']['S'],)
+            )
+        return {}
+
+
+class TieredCache:
+    """
+    Reads tiers fastest first and backfills the faster tiers on a hit; writes go to every tier
+    """
+
+    def __init__(self, tiers):
+        self.tiers = list(tiers)
+
+    def get(self, key, default=None):
+        for i, tier in enumerate(self.tiers):
+            entry = tier.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                for faster in self.tiers[:i]:
+                    faster.set(key, value, expires_at)
+                return value
+        return default
+
+    def set(self, key, value, ttl):
+        expires_at = time.time() + ttl
+        for tier in self.tiers:
+            tier.set(key, value, expires_at)
+
+    def delete(self, key):
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def get_or_compute(self, key, compute, ttl):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def stats(self):
+        return {tier.name: tier.stats() for tier in self.tiers}
+
+
+def make_key(*parts):
+    return ":".join(str(part) for part in parts)
+
+
+def build_cache():
+    """
+    Memory and /tmp tiers always, plus a shared tier on CACHE_TABLE (DynamoDB)
+    or CACHE_SQLITE_PATH (local stand-in) when configured
+    """
+    tiers = [MemoryCache()]
+    try:
+        tiers.append(FileCache())
+    except OSError as e:
+        logger.warning(f"File cache disabled: {str(e)}")
+    table_name = os.environ.get("CACHE_TABLE")
+    sqlite_path = os.environ.get("CACHE_SQLITE_PATH")
+    if table_name:
+        import boto3
+        tiers.append(SharedCache(boto3.client('dynamodb'), table_name))
+    elif sqlite_path:
+        tiers.append(SharedCache(SQLiteDynamoClient(sqlite_path), "cache"))
+    return TieredCache(tiers)
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = build_cache()
+    return _cache
@@ -0,0 +1,159 @@
+import logging
+import os
+from datetime import date, datetime, timedelta
+
+from cache import get_cache, make_key
+from costs import DATE_FORMAT, cached_cost_rows, service_totals
+
+logger = logging.getLogger()
+
+# GetDimensionValues / GetTags / GetCostCategories are billed per request, so value catalogs are
+# reused for this long and then refreshed with only the days since the previous refresh
+CATALOG_TTL = int(os.environ.get("CATALOG_TTL", "86400"))
+# Values not seen for this many days drop out of the catalog
+CATALOG_DAYS = 90
+
+DIMENSION = 'DIMENSION'
+TAG = 'TAG'
+COST_CATEGORY = 'COST_CATEGORY'
+
+# Short names accepted wherever a grouping is given, e.g. "/bills by account" or --group-by region
+DIMENSION_ALIASES = {
+    "service": "SERVICE",
+    "account": "LINKED_ACCOUNT",
+    "region": "REGION",
+    "usage_type": "USAGE_TYPE",
+    "instance_type": "INSTANCE_TYPE",
+    "operation": "OPERATION",
+    "purchase_type": "PURCHASE_TYPE",
+    "az": "AZ",
+}
+GROUP_PREFIXES = {"tag": TAG, "category": COST_CATEGORY}
+
+
+def parse_group(spec):
+    """
+    Turn "service", "LINKED_ACCOUNT", "tag:team" or "category:Team" into a Cost Explorer GroupBy
+    """
+    prefix, sep, name = spec.partition(':')
+    if sep:
+        kind = GROUP_PREFIXES.get(prefix.lower())
+        if kind is None or not name:
+            raise ValueError(f"Unknown grouping '{spec}', use tag:<key> or category:<name>")
+        return {'Type': kind, 'Key': name}
+    key = DIMENSION_ALIASES.get(spec.lower(), spec.upper())
+    if key not in DIMENSION_ALIASES.values():
+        raise ValueError(f"Unknown dimension '{spec}', expected one of {', '.join(DIMENSION_ALIASES)}")
+    return {'Type': DIMENSION, 'Key': key}
+
+
+def _fetch_values(ce_client, kind, name, start_date, end_date):
+    """
+    All values of one catalog over [start_date, end_date), following NextPageToken
+    """
+    kwargs = {'TimePeriod': {'Start': start_date.strftime(DATE_FORMAT), 'End': end_date.strftime(DATE_FORMAT)}}
+    if kind == DIMENSION:
+        call, field = ce_client.get_dimension_values, 'DimensionValues'
+        kwargs.update(Dimension=name, Context='COST_AND_USAGE')
+    elif kind == TAG:
+        # Without a key GetTags lists the tag keys themselves
+        call, field = ce_client.get_tags, 'Tags'
+        if name:
+            kwargs['TagKey'] = name
+    elif kind == COST_CATEGORY:
+        call = ce_client.get_cost_categories
+        field = 'CostCategoryValues' if name else 'CostCategoryNames'
+        if name:
+            kwargs['CostCategoryName'] = name
+    else:
+        raise ValueError(f"Unsupported catalog type: {kind}")
+
+    values = []
+    while True:
+        response = call(**kwargs)
+        for value in response.get(field, []):
+            values.append(value['Value'] if isinstance(value, dict) else value)
+        token = response.get('NextPageToken')
+        if not token:
+            break
+        kwargs['NextPageToken'] = token
+    return values
+
+
+def catalog_values(ce_client, kind, name="", today=None):
+    """
+    Sorted known values of a dimension (name), tag keys (TAG, ""), tag values (TAG, key),
+    cost category names (COST_CATEGORY, "") or cost category values (COST_CATEGORY, name).
+
+    The catalog lives in the shared cache with the day each value was last seen. Within
+    CATALOG_TTL it is returned without any API call; after that only the days since the last
+    refresh are queried and merged in.
+    """
+    today = today or datetime.now().date()
+    cache = get_cache()
+    key = make_key("catalog", kind, name)
+    entry = cache.get(key)
+    now = datetime.now().timestamp()
+    if entry is not None and now - entry['refreshed_at'] < CATALOG_TTL:
+        return entry['values']
+
+    end_date = today + timedelta(days=1)
+    oldest = today - timedelta(days=CATALOG_DAYS)
+    seen = {}
+    start_date = oldest
+    if entry is not None:
+        seen = {value: day for value, day in entry['seen'].items() if day >= oldest.isoformat()}
+        # The last day queried may have been incomplete, so it is queried again
+        start_date = max(oldest, date.fromisoformat(entry['through']) - timedelta(days=1))
+
+    fetched = _fetch_values(ce_client, kind, name, start_date, end_date)
+    for value in fetched:
+        seen[value] = today.isoformat()
+    values = sorted(seen)
+    logger.info(
+        f"Refreshed {kind} catalog '{name}' from {start_date}: {len(fetched)} fetched, {len(values)} known"
+    )
+    entry = {'values': values, 'seen': seen, 'through': today.isoformat(), 'refreshed_at': now}
+    # Kept well past CATALOG_TTL so stale entries can still be refreshed incrementally
+    cache.set(key, entry, CATALOG_DAYS * 86400)
+    return values
+
+
+def complete(values, prefix, limit=10):
+    """
+    Catalog values starting with prefix, case-insensitively, for suggestions and autocompletion
+    """
+    prefix = prefix.lower()
+    matches = [value for value in values if value.lower().startswith(prefix)]
+    return matches[:limit]
+
+
+def validate_group(ce_client, group):
+    """
+    Check a tag key or cost category name against its catalog, raising ValueError with
+    suggestions when it is unknown. Dimensions are a fixed set already checked by parse_group.
+    """
+    if group['Type'] == DIMENSION:
+        return group
+    known = catalog_values(ce_client, group['Type'])
+    if group['Key'] in known:
+        return group
+    label = "tag key" if group['Type'] == TAG else "cost category"
+    suggestions = complete(known, group['Key'][:1]) or known[:10]
+    hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+    raise ValueError(f"Unknown {label} '{group['Key']}'.{hint}")
+
+
+def breakdown(ce_client, spec, days=30, today=None):
+    """
+    (value, micro-dollar cost) pairs over the last days for a grouping such as "tag:team",
+    sorted by cost. The grouping is only validated against the catalog when the rows are not
+    already cached, so repeated breakdowns make no catalog calls.
+    """
+    group = parse_group(spec)
+    today = today or datetime.now().date()
+    rows = cached_cost_rows(
+        ce_client, today - timedelta(days=days), today, granularity='MONTHLY', group_by=[group],
+        before_fetch=lambda: validate_group(ce_client, group)
+    )
+    return service_totals(rows)
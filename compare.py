@@ -0,0 +1,88 @@
+import operator
+from collections import namedtuple
+from datetime import timedelta
+
+from cost_store import epoch_day
+
+# Per-service vectors aligned with services; amounts in micro-dollars, percent None when the
+# service had no spend in the prior window
+Comparison = namedtuple('Comparison', 'label services current prior delta percent')
+
+
+def _percent(delta, prior):
+    return delta * 100 / prior if prior else None
+
+
+def compare_windows(store, label, current_start, current_end, prior_start, prior_end=None):
+    """
+    Compare [current_start, current_end) with [prior_start, prior_end), by default the window
+    of the same length, using only the local cost store
+    """
+    start_day = epoch_day(current_start)
+    prior_day = epoch_day(prior_start)
+    if prior_end is None:
+        prior_end = prior_start + (current_end - current_start)
+    services = sorted(store.daily)
+    current = store.window_totals(services, start_day, epoch_day(current_end))
+    prior = store.window_totals(services, prior_day, epoch_day(prior_end))
+    delta = list(map(operator.sub, current, prior))
+    percent = list(map(_percent, delta, prior))
+    return Comparison(label, services, current, prior, delta, percent)
+
+
+def week_over_week(store, today):
+    """
+    Last 7 complete days against the 7 days before them
+    """
+    return compare_windows(
+        store, "vs previous 7 days", today - timedelta(days=7), today, today - timedelta(days=14)
+    )
+
+
+def day_over_week(store, today):
+    """
+    Yesterday against the same weekday a week earlier
+    """
+    yesterday = today - timedelta(days=1)
+    return compare_windows(
+        store, "vs same day last week", yesterday, today, yesterday - timedelta(days=7)
+    )
+
+
+def month_over_month(store, today):
+    """
+    Month to date against the same number of days at the start of the previous month, or the
+    whole previous month when it is shorter
+    """
+    month_start = today.replace(day=1)
+    previous_start = (month_start - timedelta(days=1)).replace(day=1)
+    previous_end = min(previous_start + (today - month_start), month_start)
+    return compare_windows(
+        store, "vs same days last month", month_start, today, previous_start, previous_end
+    )
+
+
+def comparison_start(today):
+    """
+    Earliest day any of the comparisons above reads
+    """
+    previous_month_start = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    return min(today - timedelta(days=14), previous_month_start)
+
+
+def top_movers(comparison, count=5):
+    """
+    Indexes of the services with the largest absolute change, largest first
+    """
+    delta = comparison.delta
+    moved = [i for i in range(len(delta)) if delta[i]]
+    moved.sort(key=lambda i: abs(delta[i]), reverse=True)
+    return moved[:count]
+
+
+def totals(comparison):
+    """
+    (current, prior, delta, percent) summed over all services
+    """
+    current, prior = sum(comparison.current), sum(comparison.prior)
+    return current, prior, current - prior, _percent(current - prior, prior)
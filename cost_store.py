@@ -0,0 +1,393 @@
+import json
+import logging
+import os
+import struct
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from bisect import bisect_left
+from itertools import accumulate
+
+from cache import CACHE_DIR
+from costs import HOUR_FORMAT, SERVICE_GROUP, fetch_cost_rows
+
+logger = logging.getLogger()
+
+HOURS_PER_DAY = 24
+# Cost Explorer keeps hourly data for 14 days, older hours are rolled up into daily totals
+HOURLY_RETENTION_DAYS = 14
+# Recent hours are fetched again on every ingest, as Cost Explorer keeps correcting them
+REFETCH_HOURS = 48
+DAILY_RETENTION_DAYS = int(os.environ.get("DAILY_RETENTION_DAYS", "400"))
+STORE_PATH = os.environ.get("COST_STORE_PATH", os.path.join(CACHE_DIR, "costs.bin"))
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_hour(moment):
+    """
+    Hours since the unix epoch for an aware or UTC-naive datetime
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int((moment - EPOCH).total_seconds()) // 3600
+
+
+def epoch_day(day):
+    return (day - EPOCH.date()).days
+
+
+def hour_datetime(hour):
+    return EPOCH + timedelta(hours=hour)
+
+
+class HourlySeries:
+    """
+    Time-ordered hourly costs of one service: the hour of the first sample, the gap in hours to
+    each following sample (delta encoded, two bytes each) and amounts in integer micro-dollars.
+    Hours without spend are simply absent.
+    """
+
+    __slots__ = ('base', 'last', 'deltas', 'micros')
+
+    def __init__(self, base=0):
+        self.base = base
+        self.last = base
+        self.deltas = array('H')
+        self.micros = array('q')
+
+    def append(self, hour, micros):
+        if not self.micros:
+            self.base = self.last = hour
+            self.deltas.append(0)
+            self.micros.append(micros)
+        elif hour == self.last:
+            self.micros[-1] = micros
+        elif hour > self.last:
+            self.deltas.append(hour - self.last)
+            self.micros.append(micros)
+            self.last = hour
+        else:
+            raise ValueError(f"Hour {hour} is older than the latest stored hour {self.last}")
+
+    def hours(self):
+        return [self.base + offset for offset in accumulate(self.deltas)]
+
+    def drop_from(self, hour):
+        """
+        Remove every sample at or after hour
+        """
+        hours = self.hours()
+        cut = bisect_left(hours, hour)
+        if cut == len(hours):
+            return
+        del self.deltas[cut:]
+        del self.micros[cut:]
+        if self.micros:
+            self.last = hours[cut - 1]
+
+    def split_before(self, hour):
+        """
+        Remove and return (hours, micros) of every sample older than hour
+        """
+        hours = self.hours()
+        cut = bisect_left(hours, hour)
+        if not cut:
+            return [], array('q')
+        removed = hours[:cut], self.micros[:cut]
+        del self.deltas[:cut]
+        del self.micros[:cut]
+        if self.micros:
+            self.deltas[0] = 0
+            self.base = hours[cut]
+        return removed
+
+    def dense(self, start_hour, end_hour):
+        """
+        Costs for every hour in [start_hour, end_hour), zero where nothing was recorded
+        """
+        values = array('q', bytes(8 * (end_hour - start_hour)))
+        for hour, micros in zip(self.hours(), self.micros):
+            if start_hour <= hour < end_hour:
+                values[hour - start_hour] = micros
+        return values
+
+    def nbytes(self):
+        return self.deltas.itemsize * len(self.deltas) + self.micros.itemsize * len(self.micros)
+
+
+class DailySeries:
+    """
+    Dense daily costs of one service in integer micro-dollars, starting at an epoch day
+    """
+
+    __slots__ = ('base', 'micros')
+
+    def __init__(self, base=0):
+        self.base = base
+        self.micros = array('q')
+
+    def set(self, day, micros):
+        if not self.micros:
+            self.base = day
+        elif day < self.base:
+            self.micros[:0] = array('q', bytes(8 * (self.base - day)))
+            self.base = day
+        index = day - self.base
+        if index >= len(self.micros):
+            self.micros.extend(array('q', bytes(8 * (index + 1 - len(self.micros)))))
+        self.micros[index] = micros
+
+    def drop_before(self, day):
+        if day > self.base:
+            del self.micros[:day - self.base]
+            self.base = day
+
+    def dense(self, start_day, end_day):
+        values = array('q', bytes(8 * (end_day - start_day)))
+        lo, hi = max(start_day, self.base), min(end_day, self.base + len(self.micros))
+        if lo < hi:
+            values[lo - start_day:hi - start_day] = self.micros[lo - self.base:hi - self.base]
+        return values
+
+    def nbytes(self):
+        return self.micros.itemsize * len(self.micros)
+
+
+class CostStore:
+    """
+    Local per-service cost history: recent hours at hourly resolution, older days as daily totals.
+    Days recorded from DAILY rows are authoritative; hourly samples only fill in the complete
+    days that have none.
+    """
+
+    def __init__(self):
+        self.hourly = {}
+        self.daily = {}
+        # Epoch days holding DAILY rows, and the first hour of unbroken hourly coverage
+        self.daily_days = set()
+        self.hourly_start = None
+        # Epoch day Cost Explorer history has been backfilled from, zero-spend days included
+        self.backfilled_from = None
+
+    def add_hourly(self, service, hour, micros):
+        series = self.hourly.get(service)
+        if series is None:
+            series = self.hourly[service] = HourlySeries()
+        series.append(hour, micros)
+
+    def set_daily(self, service, day, micros):
+        series = self.daily.get(service)
+        if series is None:
+            series = self.daily[service] = DailySeries()
+        series.set(day, micros)
+
+    def ingest_daily_rows(self, rows):
+        """
+        Record DAILY per-service rows, which are authoritative for their days
+        """
+        days = {}
+        for period, keys, micros in rows:
+            day = days.get(period)
+            if day is None:
+                day = days[period] = epoch_day(date.fromisoformat(period[:10]))
+                self.daily_days.add(day)
+            self.set_daily(keys[0], day, micros)
+
+    def earliest_day(self):
+        return min((series.base for series in self.daily.values() if series.micros), default=None)
+
+    def window_totals(self, services, start_day, end_day):
+        """
+        Total micro-dollars of each service over [start_day, end_day), aligned with services
+        """
+        totals = array('q')
+        for service in services:
+            series = self.daily.get(service)
+            if series is None:
+                totals.append(0)
+                continue
+            lo = max(start_day, series.base) - series.base
+            hi = min(end_day, series.base + len(series.micros)) - series.base
+            totals.append(sum(series.micros[lo:hi]) if lo < hi else 0)
+        return totals
+
+    def latest_hour(self):
+        return max((series.last for series in self.hourly.values() if series.micros), default=None)
+
+    def earliest_hour(self):
+        return min((series.base for series in self.hourly.values() if series.micros), default=None)
+
+    def drop_hours_from(self, hour):
+        for series in self.hourly.values():
+            series.drop_from(hour)
+
+    def roll_up_before(self, cutoff):
+        """
+        Free the hours before cutoff, a day boundary. Complete days without DAILY rows are
+        folded into daily totals; a day whose first hours were never fetched is dropped, so a
+        partial sum never stands in for the day.
+        """
+        start = self.hourly_start if self.hourly_start is not None else self.earliest_hour()
+        first_day = -(-start // HOURS_PER_DAY) if start is not None else None
+        rolled = 0
+        for service, series in list(self.hourly.items()):
+            hours, micros = series.split_before(cutoff)
+            day_totals = {}
+            for hour, amount in zip(hours, micros):
+                day = hour // HOURS_PER_DAY
+                if day >= first_day and day not in self.daily_days:
+                    day_totals[day] = day_totals.get(day, 0) + amount
+            for day, total in day_totals.items():
+                self.set_daily(service, day, total)
+            rolled += len(hours)
+            if not series.micros:
+                del self.hourly[service]
+        return rolled
+
+    def rollup(self, now_hour):
+        """
+        Fold whole days older than the hourly retention into daily totals, freeing their hours,
+        and drop daily totals older than the daily retention
+        """
+        rolled = self.roll_up_before((now_hour // HOURS_PER_DAY - HOURLY_RETENTION_DAYS) * HOURS_PER_DAY)
+        oldest_day = now_hour // HOURS_PER_DAY - DAILY_RETENTION_DAYS
+        for series in self.daily.values():
+            series.drop_before(oldest_day)
+        self.daily_days = {day for day in self.daily_days if day >= oldest_day}
+        if rolled:
+            logger.info(f"Rolled {rolled} hourly samples up into daily totals")
+        return rolled
+
+    def nbytes(self):
+        return sum(series.nbytes() for series in self.hourly.values()) + sum(
+            series.nbytes() for series in self.daily.values()
+        )
+
+    def save(self, path=STORE_PATH):
+        """
+        Write a JSON header followed by the raw arrays, replacing the file atomically
+        """
+        header = {
+            'hourly': [[name, s.base, s.last, len(s.micros)] for name, s in self.hourly.items()],
+            'daily': [[name, s.base, len(s.micros)] for name, s in self.daily.items()],
+            'daily_days': sorted(self.daily_days),
+            'hourly_start': self.hourly_start,
+            'backfilled_from': self.backfilled_from
+        }
+        encoded = json.dumps(header).encode()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}"
+        with open(temp_path, 'wb') as f:
+            f.write(struct.pack('<I', len(encoded)))
+            f.write(encoded)
+            for series in self.hourly.values():
+                series.deltas.tofile(f)
+                series.micros.tofile(f)
+            for series in self.daily.values():
+                series.micros.tofile(f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=STORE_PATH):
+        store = cls()
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return store
+        with f:
+            (length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length))
+            store.daily_days = set(header.get('daily_days', ()))
+            store.hourly_start = header.get('hourly_start')
+            store.backfilled_from = header.get('backfilled_from')
+            for name, base, last, count in header['hourly']:
+                series = store.hourly[name] = HourlySeries(base)
+                series.last = last
+                series.deltas.fromfile(f, count)
+                series.micros.fromfile(f, count)
+            for name, base, count in header['daily']:
+                series = store.daily[name] = DailySeries(base)
+                series.micros.fromfile(f, count)
+        return store
+
+
+def record_daily_rows(rows, granularity, group_by):
+    """
+    Ingest listener keeping the store's daily history in step with fresh Cost Explorer data
+    """
+    if granularity == 'DAILY' and group_by == [SERVICE_GROUP]:
+        store = get_cost_store()
+        store.ingest_daily_rows(rows)
+        store.save()
+
+
+def ensure_daily_history(ce_client, start_date, store=None):
+    """
+    Backfill daily totals older than the store's covered history, back to start_date. This is a
+    one-off Cost Explorer query per store; afterwards comparisons read only local data. The
+    backfill watermark is saved even when Cost Explorer returns nothing, so days without spend
+    are not queried again.
+    """
+    store = store or get_cost_store()
+    covered = [day for day in (store.earliest_day(), store.backfilled_from) if day is not None]
+    end_date = EPOCH.date() + timedelta(days=min(covered)) if covered else datetime.now().date()
+    if start_date >= end_date:
+        return 0
+    rows = list(fetch_cost_rows(ce_client, start_date, end_date, granularity='DAILY'))
+    store.ingest_daily_rows(rows)
+    store.backfilled_from = epoch_day(start_date)
+    store.save()
+    logger.info(f"Backfilled {len(rows)} daily cost rows from {start_date} to {end_date}")
+    return len(rows)
+
+
+_store = None
+
+
+def get_cost_store():
+    global _store
+    if _store is None:
+        _store = CostStore.load()
+    return _store
+
+
+def ingest_hourly(ce_client, store=None, now=None):
+    """
+    Fetch hours not yet in the store from Cost Explorer (HOURLY granularity, up to the 14 days
+    it retains) along with the last REFETCH_HOURS, which replace what was stored for them, then
+    roll older days up and persist the store
+    """
+    store = store or get_cost_store()
+    now_hour = epoch_hour(now or datetime.now(timezone.utc))
+    # Coverage starts on a day boundary so the first day rolled up is complete
+    retention_start = -(-(now_hour - HOURLY_RETENTION_DAYS * HOURS_PER_DAY) // HOURS_PER_DAY) * HOURS_PER_DAY
+    latest = store.latest_hour()
+    if latest is None or latest < retention_start:
+        if latest is not None:
+            # Hours were missed for longer than Cost Explorer keeps them: keep the complete
+            # days before the gap and start coverage again
+            store.roll_up_before(latest // HOURS_PER_DAY * HOURS_PER_DAY)
+            store.hourly = {}
+        store.hourly_start = start_hour = retention_start
+    else:
+        if store.hourly_start is None:
+            store.hourly_start = store.earliest_hour()
+        start_hour = max(retention_start, min(latest, now_hour - REFETCH_HOURS))
+    if start_hour >= now_hour:
+        return 0
+
+    hours = {}
+    count = 0
+    rows = list(fetch_cost_rows(ce_client, hour_datetime(start_hour), hour_datetime(now_hour), granularity='HOURLY'))
+    store.drop_hours_from(start_hour)
+    for period, keys, micros in sorted(rows, key=lambda row: row[0]):
+        if not micros:
+            continue
+        hour = hours.get(period)
+        if hour is None:
+            hour = hours[period] = epoch_hour(datetime.strptime(period, HOUR_FORMAT))
+        store.add_hourly(keys[0], hour, micros)
+        count += 1
+    store.rollup(now_hour)
+    store.save()
+    logger.info(f"Ingested {count} hourly cost samples, store holds {store.nbytes():,} bytes")
+    return count
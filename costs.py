@@ -0,0 +1,123 @@
+import logging
+import os
+from datetime import datetime, timedelta
+
+from cache import get_cache, make_key
+from money import parse_micros
+
+logger = logging.getLogger()
+
+DATE_FORMAT = '%Y-%m-%d'
+HOUR_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+SERVICE_GROUP = {'Type': 'DIMENSION', 'Key': 'SERVICE'}
+# Cost Explorer refreshes a few times a day, results are reused across invocations for this long
+CE_CACHE_TTL = int(os.environ.get("CE_CACHE_TTL", "3600"))
+# Daily history shared by reports, budget checks and forecasts
+DAILY_HISTORY_DAYS = 35
+
+# Callbacks run with (rows, granularity, group_by) whenever fresh Cost Explorer data is cached
+_ingest_listeners = []
+
+
+def on_ingest(listener):
+    _ingest_listeners.append(listener)
+    return listener
+
+
+def fetch_cost_rows(ce_client, start_date, end_date, granularity='MONTHLY',
+                    group_by=(SERVICE_GROUP,), metric='UnblendedCost'):
+    """
+    Yield (period_start, keys, micros) for every group across all Cost Explorer pages.
+    Amounts are parsed from the decimal strings straight into integer micro-dollars.
+    """
+    group_by = list(group_by)
+    # Tag and cost category groups come back as "<key>$<value>", keep only the value
+    tag_positions = [i for i, group in enumerate(group_by) if group['Type'] in ('TAG', 'COST_CATEGORY')]
+    # HOURLY queries take and return full timestamps
+    period_format = HOUR_FORMAT if granularity == 'HOURLY' else DATE_FORMAT
+    kwargs = {
+        'TimePeriod': {
+            'Start': start_date.strftime(period_format),
+            'End': end_date.strftime(period_format)
+        },
+        'Granularity': granularity,
+        'Metrics': [metric],
+        'GroupBy': group_by
+    }
+    pages = 0
+    while True:
+        response = ce_client.get_cost_and_usage(**kwargs)
+        pages += 1
+        for result in response['ResultsByTime']:
+            period = result['TimePeriod']['Start']
+            for group in result.get('Groups', []):
+                keys = group['Keys']
+                if tag_positions:
+                    keys = list(keys)
+                    for i in tag_positions:
+                        keys[i] = keys[i].split('$', 1)[-1]
+                yield period, tuple(keys), parse_micros(group['Metrics'][metric]['Amount'])
+        token = response.get('NextPageToken')
+        if not token:
+            break
+        kwargs['NextPageToken'] = token
+    logger.info(f"Fetched {granularity} {metric} from Cost Explorer in {pages} page(s)")
+
+
+def cached_cost_rows(ce_client, start_date, end_date, granularity='MONTHLY',
+                     group_by=(SERVICE_GROUP,), metric='UnblendedCost', ttl=CE_CACHE_TTL, before_fetch=None):
+    """
+    Same rows as fetch_cost_rows as a list, served from the shared cache when possible.
+    before_fetch runs only on a cache miss, e.g. to validate the grouping first.
+    """
+    key = make_key(
+        "ce", "micros", start_date, end_date, granularity, metric,
+        ",".join(f"{group['Type']}={group['Key']}" for group in group_by)
+    )
+
+    def fetch():
+        if before_fetch is not None:
+            before_fetch()
+        rows = list(fetch_cost_rows(ce_client, start_date, end_date, granularity, group_by, metric))
+        for listener in _ingest_listeners:
+            try:
+                listener(rows, granularity, list(group_by))
+            except Exception as e:
+                logger.error(f"Error in cost ingest listener: {str(e)}", exc_info=True)
+        return rows
+
+    return get_cache().get_or_compute(key, fetch, ttl)
+
+
+def cached_daily_rows(ce_client, today=None, metric='UnblendedCost', days=DAILY_HISTORY_DAYS):
+    """
+    Per-service DAILY rows from DAILY_HISTORY_DAYS ago through today, through the cache.
+    Every feature reading daily costs uses this window so they share one Cost Explorer query.
+    """
+    today = today or datetime.now().date()
+    start_date = today - timedelta(days=max(days, DAILY_HISTORY_DAYS))
+    return cached_cost_rows(ce_client, start_date, today + timedelta(days=1), granularity='DAILY', metric=metric)
+
+
+def rows_between(rows, start_date, end_date):
+    """
+    Keep rows whose period starts in [start_date, end_date)
+    """
+    start, end = start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT)
+    return [row for row in rows if start <= row[0] < end]
+
+
+def service_totals(rows, match=None, match_index=1):
+    """
+    Sum micro-dollar costs per service (first group key), sorted by cost, dropping services with
+    no spend.
+    When match is given, only rows whose key at match_index is in match are counted.
+    """
+    totals = {}
+    for _, keys, micros in rows:
+        if match is not None and keys[match_index] not in match:
+            continue
+        totals[keys[0]] = totals.get(keys[0], 0) + micros
+    services = [(service, cost) for service, cost in totals.items() if cost > 0]
+    services.sort(key=lambda x: x[1], reverse=True)
+    return services
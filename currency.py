@@ -0,0 +1,150 @@
+import logging
+import os
+import time
+
+from cache import get_cache, make_key
+from http_client import DEFAULT_TIMEOUT, get_template
+from money import format_money, parse_micros, scale_column
+
+logger = logging.getLogger()
+
+# All rates are fetched in a single request against USD, the currency Cost Explorer reports in
+BASE_CURRENCY = "USD"
+RATES_URL = "https://v6.exchangerate-api.com/v6/{api_key}/latest/" + BASE_CURRENCY
+
+# Rates are kept for an hour in the tiered cache, which is shared across Lambda containers
+# when CACHE_TABLE is set
+DEFAULT_TTL = 3600
+
+# Used when the rates API is unreachable
+FALLBACK_RATES = {
+    "USD": 1.0,
+    "INR": 83.34,
+}
+
+CURRENCY_SYMBOLS = {
+    "USD": "$",
+    "INR": "₹",
+    "EUR": "€",
+    "GBP": "£",
+    "JPY": "¥",
+    "CNY": "¥",
+    "AUD": "A$",
+    "CAD": "C$",
+    "SGD": "S$",
+    "AED": "AED ",
+}
+
+
+class CurrencyTable:
+    """
+    Snapshot of USD conversion rates for every currency returned by the rates API
+    """
+
+    def __init__(self, rates, fetched_at=None):
+        self.rates = dict(rates)
+        self.rates[BASE_CURRENCY] = 1.0
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        # Currencies already reported as missing, so each is logged once per table
+        self._missing = set()
+
+    def rate(self, currency):
+        currency = currency.upper()
+        if currency in self.rates:
+            return self.rates[currency]
+        if currency in FALLBACK_RATES:
+            logger.warning(f"No rate for {currency} in table, using fallback {FALLBACK_RATES[currency]}")
+            return FALLBACK_RATES[currency]
+        raise KeyError(f"Unknown currency: {currency}")
+
+    def has_rate(self, currency):
+        currency = currency.upper()
+        return currency in self.rates or currency in FALLBACK_RATES
+
+    def rate_micros(self, currency):
+        # repr gives the shortest decimal string of the rate, which is what the API sent
+        return parse_micros(repr(float(self.rate(currency))))
+
+    def convert(self, micros, currency):
+        return self.convert_column([micros], currency)[0]
+
+    def convert_column(self, micros, currency):
+        """
+        Convert a whole column of USD micro amounts in one pass, in integer arithmetic
+        """
+        return scale_column(micros, self.rate_micros(currency))
+
+    def format(self, micros, currencies=()):
+        """
+        Format a USD micro amount followed by its converted values, e.g. "$1.00 (₹83.34)"
+        """
+        return self.format_column([micros], currencies)[0]
+
+    def format_column(self, micros, currencies=()):
+        """
+        Format a column of USD micro amounts, converting each extra currency once for the whole column.
+        Currencies without a rate are left out, e.g. when only the fallback rates are available.
+        """
+        micros = list(micros)
+        converted = []
+        for currency in currencies:
+            if currency.upper() == BASE_CURRENCY:
+                continue
+            if not self.has_rate(currency):
+                if currency.upper() not in self._missing:
+                    self._missing.add(currency.upper())
+                    logger.warning(f"No rate for {currency.upper()}, leaving it out of the report")
+                continue
+            converted.append((currency_symbol(currency), self.convert_column(micros, currency)))
+        lines = []
+        for i, amount in enumerate(micros):
+            text = format_money(amount)
+            if converted:
+                text += " (" + ", ".join(format_money(column[i], symbol) for symbol, column in converted) + ")"
+            lines.append(text)
+        return lines
+
+
+def currency_symbol(currency):
+    currency = currency.upper()
+    return CURRENCY_SYMBOLS.get(currency, currency + " ")
+
+
+def report_currencies():
+    """
+    Currencies shown next to USD in reports, from REPORT_CURRENCIES (comma separated, default INR)
+    """
+    value = os.environ.get("REPORT_CURRENCIES", "INR")
+    return [currency.strip().upper() for currency in value.split(",") if currency.strip()]
+
+
+def fetch_currency_table(url=None):
+    try:
+        if url is None:
+            url = RATES_URL.format(api_key=os.environ.get("EXCHANGE_RATE_API_KEY", ""))
+        response = get_template("GET", url).send(timeout=DEFAULT_TIMEOUT)
+        data = response.json()
+        if response.status_code == 200 and data.get("conversion_rates"):
+            logger.info(f"Fetched {len(data['conversion_rates'])} conversion rates")
+            return CurrencyTable(data["conversion_rates"])
+        logger.error(f"Error fetching conversion rates: {response.status_code}")
+    except Exception as e:
+        logger.error(f"Error fetching conversion rates: {str(e)}", exc_info=True)
+    # Fallback table is marked stale so the next call retries the API
+    return CurrencyTable(FALLBACK_RATES, fetched_at=0)
+
+
+def get_currency_table(ttl=DEFAULT_TTL, url=None):
+    """
+    Return the cached currency table, refetching it once the TTL has expired
+    """
+    cache = get_cache()
+    key = make_key("fx", BASE_CURRENCY)
+    cached = cache.get(key)
+    if cached is not None:
+        return CurrencyTable(cached['rates'], cached['fetched_at'])
+    table = fetch_currency_table(url)
+    # Fallback rates are not cached so the next call retries the API
+    if table.fetched_at:
+        cache.set(key, {'rates': table.rates, 'fetched_at': table.fetched_at}, ttl)
+    return table
@@ -0,0 +1,213 @@
+"""
+Stream cost data to CSV or NDJSON for finance. Run with:
+
+    python export.py --days 365 --group-by service,account --format csv --gzip -o costs.csv.gz
+    python export.py --group-by tag:team,category:Environment --format ndjson
+    python export.py --source store --format ndjson -o - --slack-channel C0123
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+
+from catalog import DIMENSION_ALIASES, parse_group, validate_group
+from cost_store import EPOCH, epoch_day, get_cost_store
+from costs import fetch_cost_rows
+from http_client import get_session
+from money import format_decimal
+
+logger = logging.getLogger()
+
+FORMATS = ("csv", "ndjson")
+# Bytes read from disk per chunk while uploading
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def ce_rows(ce_client, start_date, end_date, dimensions, granularity='DAILY', metric='UnblendedCost'):
+    """
+    Rows straight from Cost Explorer, one page in memory at a time. Tag keys and cost
+    categories are checked against the cached catalogs first.
+    """
+    group_by = [validate_group(ce_client, parse_group(name)) for name in dimensions]
+    return fetch_cost_rows(ce_client, start_date, end_date, granularity, group_by, metric)
+
+
+def store_rows(store, start_date, end_date):
+    """
+    Per-service daily rows from the local cost store, skipping days without spend
+    """
+    start_day, end_day = epoch_day(start_date), epoch_day(end_date)
+    for service in sorted(store.daily):
+        values = store.daily[service].dense(start_day, end_day)
+        for offset, micros in enumerate(values):
+            if micros:
+                day = EPOCH.date() + timedelta(days=start_day + offset)
+                yield day.isoformat(), (service,), micros
+
+
+def write_rows(rows, dimensions, out, fmt="csv"):
+    """
+    Write (period, keys, micros) rows to a text stream as they arrive, returning the row count.
+    Amounts are exact decimal strings in USD.
+    """
+    columns = ["date", *dimensions, "amount_usd"]
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for period, keys, micros in rows:
+            writer.writerow((period, *keys, format_decimal(micros)))
+            count += 1
+    elif fmt == "ndjson":
+        for period, keys, micros in rows:
+            record = dict(zip(columns, (period, *keys, format_decimal(micros))))
+            out.write(json.dumps(record, separators=(",", ":")))
+            out.write("\n")
+            count += 1
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return count
+
+
+def open_output(path, compress=False):
+    """
+    Text stream for path ("-" for stdout), gzip-compressed on the fly when asked
+    """
+    if path == "-":
+        if compress:
+            return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb"), newline="")
+        return io.TextIOWrapper(sys.stdout.buffer, newline="", write_through=True)
+    if compress:
+        return gzip.open(path, "wt", newline="")
+    return open(path, "w", newline="")
+
+
+class MultipartFile:
+    """
+    multipart/form-data body that reads the file from disk in chunks. The total length is
+    known up front, so requests sends it with a Content-Length instead of buffering it.
+    """
+
+    def __init__(self, path, field="file", filename=None, content_type="application/octet-stream"):
+        self.boundary = os.urandom(16).hex()
+        filename = filename or os.path.basename(path)
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._file = open(path, "rb")
+        self._length = len(self._head) + os.path.getsize(path) + len(self._tail)
+        self._parts = [self._head]
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=UPLOAD_CHUNK_SIZE):
+        if size is None or size < 0:
+            size = UPLOAD_CHUNK_SIZE
+        if self._parts:
+            return self._parts.pop()
+        if self._file is not None:
+            chunk = self._file.read(size)
+            if chunk:
+                return chunk
+            self._file.close()
+            self._file = None
+            return self._tail
+        return b""
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def upload_to_slack(client, path, channel, title=None):
+    """
+    Share an exported file in a channel through Slack's external upload flow, streaming the
+    file from disk
+    """
+    filename = os.path.basename(path)
+    ticket = client.files_getUploadURLExternal(filename=filename, length=os.path.getsize(path))
+    body = MultipartFile(path, filename=filename)
+    try:
+        response = get_session().post(
+            ticket["upload_url"], data=body, headers={"Content-Type": body.content_type}, timeout=300
+        )
+        response.raise_for_status()
+    finally:
+        body.close()
+    client.files_completeUploadExternal(
+        files=[{"id": ticket["file_id"], "title": title or filename}], channel_id=channel
+    )
+    logger.info(f"Uploaded {filename} to {channel}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export AWS cost data as CSV or NDJSON")
+    parser.add_argument("--source", choices=("ce", "store"), default="ce",
+                        help="Cost Explorer (default) or the local cost store (per service only)")
+    parser.add_argument("--days", type=int, default=30, help="days of history ending today")
+    parser.add_argument("--granularity", choices=("DAILY", "MONTHLY"), default="DAILY")
+    parser.add_argument("--group-by", default="service",
+                        help=f"comma separated, from {', '.join(DIMENSION_ALIASES)}, tag:<key> or category:<name>")
+    parser.add_argument("--metric", default="UnblendedCost")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("-o", "--output", help="file path, or - for stdout")
+    parser.add_argument("--slack-channel", help="also upload the file to this channel")
+    args = parser.parse_args(argv)
+    args.group_by = [name.strip() for name in args.group_by.split(",") if name.strip()]
+    for name in args.group_by:
+        try:
+            parse_group(name)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.source == "store" and args.group_by != ["service"]:
+        parser.error("the local cost store only holds per-service totals")
+    if args.output is None:
+        suffix = f".{args.format}" + (".gz" if args.gzip else "")
+        args.output = f"aws-costs-{datetime.today().strftime('%Y-%m-%d')}{suffix}"
+    if args.slack_channel and args.output == "-":
+        parser.error("--slack-channel needs a file --output")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    end_date = datetime.today().date() + timedelta(days=1)
+    start_date = end_date - timedelta(days=args.days)
+
+    if args.source == "store":
+        rows = store_rows(get_cost_store(), start_date, end_date)
+    else:
+        import boto3
+
+        ce_client = boto3.client('ce', region_name='us-east-1')
+        try:
+            rows = ce_rows(ce_client, start_date, end_date, args.group_by, args.granularity, args.metric)
+        except ValueError as e:
+            sys.exit(f"error: {str(e)}")
+
+    with open_output(args.output, args.gzip) as out:
+        count = write_rows(rows, args.group_by, out, args.format)
+    print(f"Exported {count} rows to {args.output}", file=sys.stderr)
+
+    if args.slack_channel:
+        from slack_sdk import WebClient
+
+        client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
+        upload_to_slack(client, args.output, args.slack_channel, title=f"AWS costs {start_date} - {end_date}")
+    return count
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from slack_sdk import WebClient
+from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
+
+from costs import SERVICE_GROUP, cached_cost_rows, service_totals
+from report_diff import DELTA, SKIP
+
+logger = logging.getLogger()
+
+DEFAULT_WORKSPACE = "default"
+MAX_WORKERS = int(os.environ.get("FANOUT_MAX_WORKERS", "8"))
+# Concurrent posts allowed against a single workspace before waiting
+PER_WORKSPACE_LIMIT = int(os.environ.get("FANOUT_PER_WORKSPACE", "4"))
+
+# Example REPORT_CHANNELS value:
+# {
+#   "group_by": {"Type": "TAG", "Key": "team"},
+#   "workspaces": {"default": "SLACK_BOT_TOKEN", "partner": "PARTNER_SLACK_BOT_TOKEN"},
+#   "channels": [
+#     {"channel": "C0123", "title": "Payments", "match": ["payments"], "currencies": ["INR"]},
+#     {"channel": "C0456", "workspace": "partner", "match": ["search"]},
+#     {"channel": "C0789"}
+#   ]
+# }
+# "group_by" is the second Cost Explorer grouping next to SERVICE (e.g. LINKED_ACCOUNT or a tag),
+# "match" keeps only rows whose value for it is listed, and workspaces map to token env variables.
+
+
+def load_fanout_config():
+    """
+    Read the fan-out configuration from REPORT_CHANNELS (JSON) or REPORT_CHANNELS_FILE
+    """
+    raw = os.environ.get("REPORT_CHANNELS")
+    path = os.environ.get("REPORT_CHANNELS_FILE")
+    if not raw and path:
+        with open(path) as f:
+            raw = f.read()
+    if not raw:
+        return None
+    config = json.loads(raw)
+    config.setdefault("workspaces", {DEFAULT_WORKSPACE: "SLACK_BOT_TOKEN"})
+    config.setdefault("group_by", {'Type': 'DIMENSION', 'Key': 'LINKED_ACCOUNT'})
+    return config
+
+
+class SlackClientPool:
+    """
+    One rate-limit aware WebClient per workspace, with a bounded number of in-flight posts each
+    """
+
+    def __init__(self, workspaces, per_workspace=PER_WORKSPACE_LIMIT):
+        self.workspaces = workspaces
+        self.per_workspace = per_workspace
+        self._clients = {}
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def _client(self, workspace):
+        with self._lock:
+            if workspace not in self._clients:
+                token = os.environ.get(self.workspaces[workspace])
+                client = WebClient(token=token)
+                # Sleeps for Retry-After and retries when Slack answers 429
+                client.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=3))
+                self._clients[workspace] = client
+                self._limits[workspace] = threading.BoundedSemaphore(self.per_workspace)
+            return self._clients[workspace], self._limits[workspace]
+
+    def post(self, workspace, channel, text):
+        client, limit = self._client(workspace)
+        with limit:
+            return client.chat_postMessage(channel=channel, text=text)
+
+
+def fetch_shared_aggregate(ce_client, config, days=30):
+    """
+    Fetch the cost rows every channel view is rendered from, in a single Cost Explorer query
+    """
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=days)
+    group_by = [SERVICE_GROUP, config["group_by"]]
+    return cached_cost_rows(ce_client, start_date, end_date, group_by=group_by)
+
+
+def fan_out(ce_client, config, render, pool=None, differ=None, render_delta=None):
+    """
+    Render and post one report per configured channel from a shared aggregate.
+    render(services, currencies, title) must return the message text.
+    With a ReportDiffer, channels whose aggregates did not change materially are skipped before
+    rendering, and small changes are posted as render_delta(changes, services, currencies, title).
+    Returns a list of (channel, error) with error None on success.
+    """
+    rows = fetch_shared_aggregate(ce_client, config)
+    pool = pool or SlackClientPool(config["workspaces"])
+    channels = config["channels"]
+
+    def deliver(channel_config):
+        channel = channel_config["channel"]
+        try:
+            match = channel_config.get("match")
+            services = service_totals(rows, match=set(match) if match else None)
+            currencies, title = channel_config.get("currencies"), channel_config.get("title")
+            decision = differ.decide(channel, services) if differ is not None else None
+            if decision is not None and decision.action == SKIP:
+                return channel, None
+            if decision is not None and decision.action == DELTA and render_delta is not None:
+                message = render_delta(decision.changes, services, currencies, title)
+            else:
+                message = render(services, currencies, title)
+            pool.post(channel_config.get("workspace", DEFAULT_WORKSPACE), channel, message)
+            if decision is not None:
+                differ.commit(channel, decision.fingerprint)
+            return channel, None
+        except Exception as e:
+            logger.error(f"Error posting report to {channel}: {str(e)}", exc_info=True)
+            return channel, str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(channels)))) as executor:
+        results = list(executor.map(deliver, channels))
+
+    failed = [channel for channel, error in results if error]
+    logger.info(f"Fan-out posted {len(results) - len(failed)}/{len(results)} reports from {len(rows)} cost rows")
+    return results
@@ -0,0 +1,106 @@
+import calendar
+import math
+import operator
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from costs import DATE_FORMAT
+
+# ~95% band around the projected month end
+Z_SCORE = 1.96
+WEEK = 7
+
+Forecast = namedtuple('Forecast', 'month_to_date projected lower upper')
+
+
+def daily_series(rows, start_date, end_date):
+    """
+    Align DAILY rows into one integer micro-dollar array per service, with a slot for every day
+    in [start_date, end_date)
+    """
+    days = (end_date - start_date).days
+    index = {
+        (start_date + timedelta(days=i)).strftime(DATE_FORMAT): i
+        for i in range(days)
+    }
+    series = {}
+    for period, keys, micros in rows:
+        i = index.get(period)
+        if i is None:
+            continue
+        values = series.get(keys[0])
+        if values is None:
+            values = series[keys[0]] = array('q', bytes(8 * days))
+        values[i] += micros
+    return series
+
+
+def total_series(series, days):
+    total = array('q', bytes(8 * days))
+    for values in series.values():
+        total = array('q', map(operator.add, total, values))
+    return total
+
+
+def forecast_month_end(series, start_date, today=None):
+    """
+    Project each service's month-end total from complete days [start_date, today).
+
+    Every series is fitted by least squares with a linear trend plus one level per weekday
+    (a single level when there are fewer than two weeks of data). All series share the same
+    time axis, so the axis statistics are computed once and each fit reduces to a handful of
+    C-level sums: a dot product, a sum of squares and one strided slice per weekday.
+    Returns {service: Forecast} in the units of the series.
+    """
+    today = today or datetime.now().date()
+    days = (today - start_date).days
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    # Slots of the current month that already have data, and the days still to come
+    month_start = max(0, (today.replace(day=1) - start_date).days)
+    horizon = range(days, days + days_in_month - today.day + 1)
+    period = WEEK if days >= 2 * WEEK else 1
+
+    # Shared time axis, centred, and the mean centred time of each weekday slot
+    t_mean = (days - 1) / 2
+    centred = array('d', (t - t_mean for t in range(days)))
+    slot_sizes = [len(range(k, days, period)) for k in range(period)]
+    slot_t = [sum(centred[k::period]) / slot_sizes[k] for k in range(period)]
+    # Time variance left once each slot has its own level
+    sxx = sum(map(operator.mul, centred, centred)) - sum(
+        size * t * t for size, t in zip(slot_sizes, slot_t)
+    )
+    future_slots = [0] * period
+    for t in horizon:
+        future_slots[t % period] += 1
+    future_centred = sum(t - t_mean for t in horizon) - sum(
+        count * t for count, t in zip(future_slots, slot_t)
+    )
+    dof = max(1, days - period - 1)
+
+    forecasts = {}
+    for service, y in series.items():
+        month_to_date = sum(y[month_start:days])
+        if days < 3:
+            level = y[days - 1] if days else 0.0
+            projected = month_to_date + level * len(horizon)
+            forecasts[service] = Forecast(month_to_date, projected, projected, projected)
+            continue
+
+        slot_sums = [sum(y[k::period]) for k in range(period)]
+        slot_means = list(map(operator.truediv, slot_sums, slot_sizes))
+        sxy = sum(map(operator.mul, centred, y)) - sum(map(operator.mul, slot_t, slot_sums))
+        slope = sxy / sxx
+        # Residual sum of squares from the sufficient statistics
+        sse = sum(map(operator.mul, y, y)) - sum(map(operator.mul, slot_sums, slot_means)) - slope * sxy
+
+        future = sum(map(operator.mul, future_slots, slot_means)) + slope * future_centred
+        future = max(0.0, future)
+
+        sigma = math.sqrt(max(0.0, sse) / dof)
+        band = Z_SCORE * sigma * math.sqrt(len(horizon))
+        projected = month_to_date + future
+        forecasts[service] = Forecast(
+            month_to_date, projected, max(month_to_date, projected - band), projected + band
+        )
+    return forecasts
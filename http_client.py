@@ -0,0 +1,61 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.caching import CachingHTTPAdapter, ResponseCache
+
+from cache import CACHE_DIR
+
+# Connections kept alive per host, shared by every outbound HTTP call in the container
+POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "10"))
+DEFAULT_TIMEOUT = 10
+
+# URL prefixes of slowly changing APIs whose GET responses are kept in an HTTP cache, in memory
+# and under /tmp, honouring Cache-Control and revalidating with ETag/Last-Modified. Stale
+# responses are served when the API is down.
+HTTP_CACHE_PREFIXES = [
+    prefix.strip()
+    for prefix in os.environ.get("HTTP_CACHE_PREFIXES", "https://v6.exchangerate-api.com/").split(",")
+    if prefix.strip()
+]
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", os.path.join(CACHE_DIR, "http"))
+
+_session = None
+_lock = threading.Lock()
+_templates = {}
+
+
+def get_session():
+    """
+    Return the process-wide requests.Session so warm invocations reuse TLS connections
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                if HTTP_CACHE_PREFIXES:
+                    cached = CachingHTTPAdapter(
+                        ResponseCache(directory=HTTP_CACHE_DIR), stale_if_error=True,
+                        pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE
+                    )
+                    for prefix in HTTP_CACHE_PREFIXES:
+                        session.mount(prefix, cached)
+                _session = session
+    return _session
+
+
+def get_template(method, url):
+    """
+    Return a prepared request template for an endpoint called repeatedly on the shared session,
+    so each call only fills in its body and variable params
+    """
+    key = (method, url)
+    template = _templates.get(key)
+    if template is None:
+        template = _templates[key] = get_session().template(method, url)
+    return template
@@ -3,16 +3,10 @@ import requests
 import os
 from datetime import datetime, timedelta
 import slack
-# Function to get the USD to INR exchange rate dynamically
-def get_exchange_rate():
-    url = "https://v6.exchangerate-api.com/v6/54c6243ebcfc045f40ea797b/latest/USD"  # Replace with your API key
-    response = requests.get(url)
-    data = response.json()
-    if response.status_code == 200 and data.get("conversion_rates"):
-        return data["conversion_rates"]["INR"]
-    else:
-        print("Error fetching exchange rate.")
-        return 82.5  # Default fallback rate
+from currency import get_currency_table, report_currencies
+from money import div_round, parse_micros
+
+RATES_URL = "https://v6.exchangerate-api.com/v6/54c6243ebcfc045f40ea797b/latest/USD"  # Replace with your API key
 
 # Lambda handler function
 def lambda_handler(event, context):
@@ -35,12 +29,13 @@ def lambda_handler(event, context):
     )
 
     # Initialize variables
-    total_cost_today = 0.00
-    total_cost_last_30_days = 0.00
+    total_cost_today = 0
+    total_cost_last_30_days = 0
     services_cost = {}
 
-    # Fetch the dynamic exchange rate (USD to INR)
-    exchange_rate = get_exchange_rate()
+    # Fetch all conversion rates in one request (cached across warm invocations)
+    currency_table = get_currency_table(url=RATES_URL)
+    currencies = report_currencies()
 
     # Parse the response and calculate totals
     for result in response['ResultsByTime']:
@@ -49,19 +44,22 @@ def lambda_handler(event, context):
         
         # If it's today's date, capture the cost for today
         if date == today:
-            total_cost_today = float(result['Total']['AmortizedCost']['Amount'])
+            total_cost_today = parse_micros(result['Total']['AmortizedCost']['Amount'])
         
         # Accumulate the cost for the last 30 days
         for group in result.get('Groups', []):
             service_name = group['Keys'][0]
-            service_cost = float(group['Metrics']['AmortizedCost']['Amount'])
+            service_cost = parse_micros(group['Metrics']['AmortizedCost']['Amount'])
             
             if service_name not in services_cost:
-                services_cost[service_name] = 0.0
+                services_cost[service_name] = 0
             services_cost[service_name] += service_cost
 
     # Calculate the total cost for the last 30 days
     total_cost_last_30_days = sum(services_cost.values())
+    service_amounts = currency_table.format_column(services_cost.values(), currencies)
+    today_text = currency_table.format(total_cost_today, currencies)
+    total_text = currency_table.format(total_cost_last_30_days, currencies)
 
     # Prepare the message for Slack
     slack_message = {
@@ -78,7 +76,7 @@ def lambda_handler(event, context):
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": f"\n- *Today's Total*: ${total_cost_today:.2f} (₹{total_cost_today * exchange_rate:.2f})"
+                    "text": f"\n- *Today's Total*: {today_text}"
                     if total_cost_today > 0 else "No costs incurred today"
                 }
             },
@@ -87,8 +85,8 @@ def lambda_handler(event, context):
                 "text": {
                     "type": "mrkdwn",
                     "text": f":date: *30-DAY COST BREAKDOWN*\n{start_date} - {today}\n" +
-                            "\n".join([f"📌 {service} - ${cost:.2f} (₹{cost * exchange_rate:.2f})" for service, cost in services_cost.items()]) +
-                            f"\n*Monthly Total*: ${total_cost_last_30_days:.2f} (₹{total_cost_last_30_days * exchange_rate:.2f})"
+                            "\n".join([f"📌 {service} - {amount}" for service, amount in zip(services_cost, service_amounts)]) +
+                            f"\n*Monthly Total*: {total_text}"
                 }
             },
             {
@@ -96,9 +94,9 @@ def lambda_handler(event, context):
                 "text": {
                     "type": "mrkdwn",
                     "text": "📌 *SUMMARY*\n" +
-                            f"📅 *Today's Spending* - ${total_cost_today:.2f} (₹{total_cost_today * exchange_rate:.2f})\n" +
-                            f"📊 *Last 30 Days Total* - ${total_cost_last_30_days:.2f} (₹{total_cost_last_30_days * exchange_rate:.2f})\n" +
-                            f"📉 *Daily Average Cost* - ${total_cost_last_30_days / 30:.2f} (₹{(total_cost_last_30_days / 30) * exchange_rate:.2f})"
+                            f"📅 *Today's Spending* - {today_text}\n" +
+                            f"📊 *Last 30 Days Total* - {total_text}\n" +
+                            f"📉 *Daily Average Cost* - {currency_table.format(div_round(total_cost_last_30_days, 30), currencies)}"
                 }
             }
         ]
@@ -0,0 +1,66 @@
+from array import array
+from decimal import ROUND_HALF_EVEN, Decimal
+
+# Amounts are integer micro-units (1 USD = 1,000,000), exact to sum and compare
+MICROS = 1_000_000
+SCALE_DIGITS = 6
+CENT = MICROS // 100
+
+
+def parse_micros(text):
+    """
+    Parse a decimal string such as Cost Explorer's "Amount" ("12.3456789012") into integer
+    micro-units without going through float, rounding half to even on the 7th decimal
+    """
+    whole, _, fraction = text.partition('.')
+    try:
+        if len(fraction) <= SCALE_DIGITS:
+            return int(whole + fraction.ljust(SCALE_DIGITS, '0'))
+        micros = int(whole + fraction[:SCALE_DIGITS])
+        rest = fraction[SCALE_DIGITS:].rstrip('0')
+        if rest and not rest.isdecimal():
+            raise ValueError(text)
+    except ValueError:
+        # Exponent notation, whitespace and other rare forms
+        return int(Decimal(text).scaleb(SCALE_DIGITS).quantize(1, rounding=ROUND_HALF_EVEN))
+    if rest:
+        half = '5'.ljust(len(rest), '0')
+        if rest > half or (rest == half and micros % 2):
+            micros += -1 if whole.startswith('-') else 1
+    return micros
+
+
+def div_round(numerator, denominator):
+    """
+    Integer division rounding half away from zero
+    """
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return -quotient if numerator < 0 else quotient
+
+
+def scale_column(micros, rate_micros):
+    """
+    Multiply a column of micro amounts by a rate given in micro-units, staying in integers
+    """
+    return array('q', (div_round(value * rate_micros, MICROS) for value in micros))
+
+
+def format_money(micros, symbol="$"):
+    """
+    Format micro-units as currency rounded to cents, e.g. 1234567891 -> "$1,234.57"
+    """
+    cents = div_round(micros, CENT)
+    sign = "-" if cents < 0 else ""
+    whole, cents = divmod(abs(cents), 100)
+    return f"{symbol}{sign}{whole:,}.{cents:02d}"
+
+
+def format_decimal(micros):
+    """
+    Exact plain decimal string of micro-units for machine-readable output, e.g. -1500 -> "-0.001500"
+    """
+    sign = "-" if micros < 0 else ""
+    whole, fraction = divmod(abs(micros), MICROS)
+    return f"{sign}{whole}.{fraction:06d}"
@@ -0,0 +1,190 @@
+import logging
+import os
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from cache import get_cache, make_key
+from compare import comparison_start, day_over_week, month_over_month, totals, week_over_week
+from cost_store import ensure_daily_history, get_cost_store
+from costs import DAILY_HISTORY_DAYS, DATE_FORMAT, cached_daily_rows, rows_between, service_totals
+from currency import get_currency_table, report_currencies
+from forecast import daily_series, forecast_month_end, total_series
+from money import div_round, parse_micros
+from renderers import RENDERERS
+
+logger = logging.getLogger()
+
+# metric: Cost Explorer metric, window_days: length of the report window ending today,
+# style: renderer name, tax: flat amount added to the total, in micro-dollars
+ReportConfig = namedtuple('ReportConfig', 'metric window_days style tax')
+DEFAULT_CONFIG = {"metric": "UnblendedCost", "window_days": 30, "style": "bill_cycle", "tax": 0}
+# The local cost store and its comparisons hold this metric
+STORE_METRIC = "UnblendedCost"
+
+# Everything a renderer needs; amounts in micro-dollars, (service, cost) lists sorted by cost.
+# comparison is the week over week Comparison, trends (label, current, prior, delta, percent)
+# account totals for other periods.
+ReportData = namedtuple(
+    'ReportData',
+    'start_date end_date services total today_services today_total daily_average forecast comparison trends'
+)
+
+
+def load_report_config(**defaults):
+    """
+    Report settings from REPORT_METRIC, REPORT_WINDOW_DAYS, REPORT_STYLE and REPORT_TAX, over
+    the deployment's own defaults and then DEFAULT_CONFIG
+    """
+    values = {**DEFAULT_CONFIG, **defaults}
+    for name in values:
+        value = os.environ.get(f"REPORT_{name.upper()}")
+        if value:
+            values[name] = value
+    if values["style"] not in RENDERERS:
+        raise ValueError(f"Unknown report style: {values['style']}")
+    return ReportConfig(
+        values["metric"], int(values["window_days"]), values["style"], parse_micros(str(values["tax"]))
+    )
+
+
+def fetch_rows(ce_client, config, end_date):
+    """
+    Fetch stage: per-service DAILY rows covering the window, the forecast history and today,
+    through the shared cache. For the store's metric, the cost store is also backfilled once
+    with the older days the period comparisons read.
+    """
+    rows = cached_daily_rows(ce_client, end_date, metric=config.metric, days=config.window_days)
+    if config.metric == STORE_METRIC:
+        store = get_cost_store()
+        store.ingest_daily_rows(rows)
+        try:
+            ensure_daily_history(ce_client, comparison_start(end_date), store)
+        except Exception as e:
+            logger.error(f"Error backfilling the cost store: {str(e)}", exc_info=True)
+    return rows
+
+
+def normalize_rows(rows, config, end_date):
+    """
+    Normalize stage: drop rows without spend
+    """
+    return [row for row in rows if row[2]]
+
+
+def aggregate_rows(rows, config, end_date):
+    """
+    Aggregate stage: window and today's totals, month-end forecast and week-over-week movers,
+    all from the same rows
+    """
+    start_date = end_date - timedelta(days=config.window_days)
+    services = service_totals(rows_between(rows, start_date, end_date))
+    total = sum(cost for _, cost in services)
+    today_services = service_totals(rows_between(rows, end_date, end_date + timedelta(days=1)))
+
+    history_start = end_date - timedelta(days=DAILY_HISTORY_DAYS)
+    series = {'TOTAL': total_series(daily_series(rows, history_start, end_date), DAILY_HISTORY_DAYS)}
+    forecast = forecast_month_end(series, history_start, end_date)['TOTAL']
+
+    comparison = None
+    trends = []
+    if config.metric == STORE_METRIC:
+        store = get_cost_store()
+        comparison = week_over_week(store, end_date)
+        periods = [("Yesterday", day_over_week(store, end_date))]
+        # On the 1st there are no days of this month to compare yet
+        if end_date.day > 1:
+            periods.append(("Month to date", month_over_month(store, end_date)))
+        trends = [(f"{name} {period.label}", *totals(period)) for name, period in periods]
+
+    return ReportData(
+        start_date, end_date, services, total, today_services,
+        sum(cost for _, cost in today_services), div_round(total, config.window_days), forecast, comparison,
+        trends
+    )
+
+
+class ReportPipeline:
+    """
+    fetch -> normalize -> aggregate -> render -> deliver, with every stage replaceable and timed.
+    Rendered reports are cached for cache_ttl seconds when it is set.
+    """
+
+    def __init__(self, ce_client, config=None, fetch=fetch_rows, normalize=normalize_rows,
+                 aggregate=aggregate_rows, render=None, cache_ttl=0, currency_table=None):
+        self.ce_client = ce_client
+        self.config = config or load_report_config()
+        self.fetch = fetch
+        self.normalize = normalize
+        self.aggregate = aggregate
+        self.renderer = render or RENDERERS[self.config.style]
+        self.cache_ttl = cache_ttl
+        self.currency_table = currency_table
+        self.timings = {}
+
+    def _timed(self, stage, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        self.timings[stage] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    def build(self, end_date=None):
+        """
+        Run fetch, normalize and aggregate, returning ReportData
+        """
+        end_date = end_date or datetime.now().date()
+        logger.info(
+            f"Building {self.config.style} report of {self.config.metric} for the "
+            f"{self.config.window_days} days to {end_date.strftime(DATE_FORMAT)}"
+        )
+        rows = self._timed("fetch", self.fetch, self.ce_client, self.config, end_date)
+        rows = self._timed("normalize", self.normalize, rows, self.config, end_date)
+        return self._timed("aggregate", self.aggregate, rows, self.config, end_date)
+
+    def render(self, data, currencies=None, title=None, config=None):
+        if currencies is None:
+            currencies = report_currencies()
+        currency_table = self.currency_table or get_currency_table()
+        logger.info(f"Rendering costs in USD and {', '.join(currencies)}")
+        return self._timed("render", self.renderer, data, currency_table, currencies, config or self.config, title)
+
+    def render_services(self, services, currencies=None, title=None, end_date=None):
+        """
+        Render (service, cost) pairs aggregated elsewhere, e.g. one fan-out channel's share.
+        The flat tax belongs to the account bill, so it is not added to a share's total.
+        """
+        end_date = end_date or datetime.now().date()
+        total = sum(cost for _, cost in services)
+        data = ReportData(
+            end_date - timedelta(days=self.config.window_days), end_date, services, total, [], 0,
+            div_round(total, self.config.window_days), None, None, []
+        )
+        return self.render(data, currencies, title, self.config._replace(tax=0))
+
+    def run(self, currencies=None, deliver=None, end_date=None, title=None):
+        """
+        Build and render the report, then hand it to deliver(text) when given
+        """
+        end_date = end_date or datetime.now().date()
+        if currencies is None:
+            currencies = report_currencies()
+        self.timings = {}
+
+        def build():
+            return self.render(self.build(end_date), currencies, title)
+
+        if self.cache_ttl:
+            config = self.config
+            key = make_key(
+                "report", config.style, config.metric, config.window_days, config.tax, end_date,
+                ",".join(currencies), title or ""
+            )
+            cache = get_cache()
+            message = self._timed("total", cache.get_or_compute, key, build, self.cache_ttl)
+            logger.info(f"Cache stats: {cache.stats()}")
+        else:
+            message = self._timed("total", build)
+        if deliver is not None:
+            self._timed("deliver", deliver, message)
+        logger.info(f"Report pipeline timings (ms): {self.timings}")
+        return message
@@ -134,6 +134,21 @@ def _urllib3_request_context(
     return host_params, pool_kwargs
 
 
+def _grow_pool(pool, maxsize):
+    queue = pool.pool
+    if queue is None or queue.maxsize >= maxsize:
+        return
+    with queue.mutex:
+        extra = maxsize - queue.maxsize
+        if extra <= 0:
+            return
+        queue.maxsize = maxsize
+        # Empty slots go to the bottom of the LIFO queue so idle connections
+        # are still handed out first.
+        queue.queue[:0] = [None] * extra
+        queue.not_empty.notify(extra)
+
+
 class BaseAdapter:
     """The Base Transport Adapter"""
 
@@ -301,6 +316,33 @@ class HTTPAdapter(BaseAdapter):
 
         return manager
 
+    def ensure_pool_size(self, maxsize):
+        """Grows the connection pools to keep at least ``maxsize`` connections
+        per host, e.g. before sending that many requests concurrently.
+
+        Pools are grown in place: they keep their pool key and their open
+        connections and gain empty slots, so connections opened by concurrent
+        requests are returned to the pool instead of being discarded. Pools
+        created later are grown the first time they are used. Pools are never
+        shrunk.
+
+        :param maxsize: The number of connections to keep per host.
+        """
+        if maxsize <= self._pool_maxsize:
+            return
+        self._pool_maxsize = maxsize
+        # maxsize is part of urllib3's pool key, so connection_pool_kw is left
+        # alone: changing it would make the next request build a second pool
+        # for the same host and orphan the one grown here.
+        managers = [self.poolmanager, *self.proxy_manager.values()]
+        for manager in managers:
+            for key in manager.pools.keys():
+                try:
+                    pool = manager.pools[key]
+                except KeyError:
+                    continue
+                _grow_pool(pool, maxsize)
+
     def cert_verify(self, conn, url, verify, cert):
         """Verify a SSL certificate. This method should not be called from user
         code, and is only exposed for use when subclassing the
@@ -490,6 +532,7 @@ class HTTPAdapter(BaseAdapter):
                 **host_params, pool_kwargs=pool_kwargs
             )
 
+        _grow_pool(conn, self._pool_maxsize)
         return conn
 
     def get_connection(self, url, proxies=None):
@@ -0,0 +1,592 @@
+"""
+requests.caching
+~~~~~~~~~~~~~~~~
+
+This module contains a transport adapter that keeps responses in a private
+HTTP cache. Fresh responses are answered without touching the network and
+stale ones are revalidated with their ``ETag`` or ``Last-Modified``.
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+
+from urllib3._collections import HTTPHeaderDict
+from urllib3.response import HTTPResponse
+
+from .adapters import HTTPAdapter
+from .exceptions import ConnectionError, Timeout
+from .models import _translate_read_errors
+
+CACHEABLE_METHODS = frozenset(("GET", "HEAD"))
+# Statuses whose responses are stored, those cacheable by default (RFC 9110, 15.1)
+CACHEABLE_STATUSES = frozenset((200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501))
+# Server errors a stale response may stand in for
+ERROR_STATUSES = frozenset((500, 502, 503, 504))
+# Headers that describe one connection or one client and are never stored
+UNSTORED_HEADERS = frozenset(
+    (
+        "connection",
+        "keep-alive",
+        "proxy-connection",
+        "set-cookie",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+    )
+)
+# Headers of a 304 that do not replace the stored ones
+UNMERGED_HEADERS = UNSTORED_HEADERS | {"content-length", "content-encoding"}
+CONDITIONAL_HEADERS = (
+    "If-Match",
+    "If-None-Match",
+    "If-Modified-Since",
+    "If-Unmodified-Since",
+    "If-Range",
+)
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_DISK_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_BODY_SIZE = 8 * 1024 * 1024
+# A response with a Last-Modified but no explicit expiration stays fresh for
+# this share of its age when it was sent, up to a day (RFC 9111, 4.2.2)
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX_AGE = 24 * 3600
+
+
+def parse_cache_control(value):
+    """Parses a ``Cache-Control`` header into a dict of lowercase directives,
+    each mapped to its argument or None.
+
+    :rtype: dict
+    """
+    directives = {}
+    for part in (value or "").split(","):
+        name, sep, arg = part.partition("=")
+        name = name.strip().lower()
+        if name:
+            directives[name] = arg.strip().strip('"') if sep else None
+    return directives
+
+
+def _seconds(directives, name):
+    try:
+        return max(0, int(directives[name]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _http_date(value):
+    if not value:
+        return None
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.timestamp()
+
+
+def freshness_lifetime(headers, status=200):
+    """Returns how many seconds a response stays fresh from the time it was
+    generated, 0 when it must be revalidated before every use.
+
+    :param headers: the response headers, a case-insensitive mapping.
+    :rtype: float
+    """
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    if "no-cache" in directives or "no-store" in directives:
+        return 0
+    max_age = _seconds(directives, "max-age")
+    if max_age is not None:
+        return max_age
+
+    date = _http_date(headers.get("Date")) or time.time()
+    if "Expires" in headers:
+        # An invalid date, such as "0", means already expired
+        expires = _http_date(headers["Expires"])
+        return max(0, expires - date) if expires is not None else 0
+
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if last_modified is not None and status in CACHEABLE_STATUSES:
+        return min(max(0, date - last_modified) * HEURISTIC_FRACTION, HEURISTIC_MAX_AGE)
+    return 0
+
+
+class CacheEntry:
+    """A stored response: its status, headers and body as received, before
+    any content decoding, so it can be replayed like the original."""
+
+    __slots__ = ("status", "reason", "headers", "body", "vary", "stored_at", "lifetime")
+
+    def __init__(self, status, reason, headers, body, vary, stored_at, lifetime):
+        self.status = status
+        self.reason = reason
+        #: :class:`HTTPHeaderDict <urllib3._collections.HTTPHeaderDict>`
+        self.headers = headers
+        self.body = body
+        #: Request header values the response varies on, by lowercase name.
+        self.vary = vary
+        #: When the response was generated, corrected for its Age.
+        self.stored_at = stored_at
+        self.lifetime = lifetime
+
+    @classmethod
+    def from_response(cls, request, resp, body, response_time):
+        """Builds an entry from a urllib3 response and its undecoded body.
+
+        :rtype: CacheEntry
+        """
+        headers = HTTPHeaderDict()
+        for name, value in resp.headers.items():
+            if name.lower() not in UNSTORED_HEADERS:
+                headers.add(name, value)
+        if request.method != "HEAD":
+            headers["Content-Length"] = str(len(body))
+
+        vary = {}
+        for name in resp.headers.get("Vary", "").split(","):
+            name = name.strip().lower()
+            if name:
+                vary[name] = request.headers.get(name)
+
+        return cls(
+            resp.status,
+            resp.reason,
+            headers,
+            body,
+            vary,
+            response_time - _initial_age(headers, response_time),
+            freshness_lifetime(headers, resp.status),
+        )
+
+    def revalidated(self, resp, response_time):
+        """Returns a copy of the entry with the headers of a 304 response
+        merged in and its age reset.
+
+        :rtype: CacheEntry
+        """
+        headers = self.headers.copy()
+        names = {name.lower() for name in resp.headers} - UNMERGED_HEADERS
+        for name in names:
+            headers.discard(name)
+            for value in resp.headers.getlist(name):
+                headers.add(name, value)
+        return CacheEntry(
+            self.status,
+            self.reason,
+            headers,
+            self.body,
+            self.vary,
+            response_time - _initial_age(headers, response_time),
+            freshness_lifetime(headers, self.status),
+        )
+
+    def age(self, now):
+        return max(0, now - self.stored_at)
+
+    def is_fresh(self, now, max_age=None):
+        age = self.age(now)
+        return age < self.lifetime and (max_age is None or age <= max_age)
+
+    def matches(self, request):
+        """Whether the request sends the header values the entry varies on."""
+        return all(
+            request.headers.get(name) == value for name, value in self.vary.items()
+        )
+
+    def validators(self):
+        """Returns the conditional headers that revalidate this entry.
+
+        :rtype: dict
+        """
+        validators = {}
+        if "ETag" in self.headers:
+            validators["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+        return validators
+
+    def dump(self, f):
+        meta = {
+            "status": self.status,
+            "reason": self.reason,
+            "headers": list(self.headers.items()),
+            "vary": self.vary,
+            "stored_at": self.stored_at,
+            "lifetime": self.lifetime,
+        }
+        f.write(json.dumps(meta, separators=(",", ":")).encode("utf-8"))
+        f.write(b"\n")
+        f.write(self.body)
+
+    @classmethod
+    def load(cls, f):
+        meta = json.loads(f.readline())
+        return cls(
+            meta["status"],
+            meta["reason"],
+            HTTPHeaderDict(meta["headers"]),
+            f.read(),
+            meta["vary"],
+            meta["stored_at"],
+            meta["lifetime"],
+        )
+
+
+def _initial_age(headers, response_time):
+    try:
+        age = max(0, int(headers.get("Age", 0)))
+    except ValueError:
+        age = 0
+    date = _http_date(headers.get("Date"))
+    if date is not None:
+        age = max(age, response_time - date)
+    return age
+
+
+class ResponseCache:
+    """A thread-safe LRU cache of :class:`CacheEntry` objects, kept in memory
+    and, when given a directory, on disk where they outlive the process.
+
+    :param max_entries: The number of entries kept in memory.
+    :param directory: (optional) Directory of the disk tier.
+    :param max_disk_bytes: Total size of the disk tier, beyond which the
+        least recently used entries are removed.
+    """
+
+    def __init__(
+        self,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        directory=None,
+        max_disk_bytes=DEFAULT_MAX_DISK_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        # File name -> size, least recently used first
+        self._files = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._load_index()
+
+    def __getstate__(self):
+        return {
+            "max_entries": self.max_entries,
+            "directory": self.directory,
+            "max_disk_bytes": self.max_disk_bytes,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _load_index(self):
+        # Access times are kept as modification times, which survive noatime
+        files = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith(".entry") and item.is_file():
+                    stat = item.stat()
+                    files.append((stat.st_mtime, item.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._files[name] = size
+            self._disk_bytes += size
+
+    def _file_name(self, key):
+        return hashlib.sha256(key.encode("utf-8")).hexdigest() + ".entry"
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _forget_file(self, name):
+        self._disk_bytes -= self._files.pop(name, 0)
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+    def get(self, key):
+        """Returns the entry stored for key, or None.
+
+        :rtype: CacheEntry
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        if self.directory is None:
+            return None
+
+        name = self._file_name(key)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f:
+                entry = CacheEntry.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self._forget_file(name)
+            return None
+        with self._lock:
+            if name in self._files:
+                self._files.move_to_end(name)
+            self._remember(key, entry)
+        return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._remember(key, entry)
+        if self.directory is None:
+            return
+
+        name = self._file_name(key)
+        path = os.path.join(self.directory, name)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temp_path, "wb") as f:
+            entry.dump(f)
+            size = f.tell()
+        os.replace(temp_path, path)
+        with self._lock:
+            self._disk_bytes += size - self._files.pop(name, 0)
+            self._files[name] = size
+            while self._disk_bytes > self.max_disk_bytes and self._files:
+                self._forget_file(next(iter(self._files)))
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+            if self.directory is not None:
+                self._forget_file(self._file_name(key))
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            for name in list(self._files):
+                self._forget_file(name)
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """An :class:`HTTPAdapter <requests.adapters.HTTPAdapter>` that answers
+    GET and HEAD requests from a private HTTP cache.
+
+    Responses are stored as ``Cache-Control`` and ``Expires`` allow. While
+    fresh they are served without touching the network; once stale they are
+    revalidated with ``If-None-Match``/``If-Modified-Since``, so an unchanged
+    resource only costs a 304. Requests that send their own conditional
+    headers or ``Cache-Control: no-store`` bypass the cache, and successful
+    requests with other methods invalidate the URL. Responses returned by the
+    adapter have a ``from_cache`` attribute.
+
+    :param cache: (optional) The :class:`ResponseCache` to use, by default
+        an in-memory one.
+    :param stale_if_error: Whether a stale response is served when the server
+        cannot be reached or answers with a 5xx error, unless the response
+        said ``must-revalidate``. A number limits how many seconds past its
+        freshness a response is still served.
+    :param max_body_size: Bodies larger than this are not cached. Streamed
+        responses without a ``Content-Length`` are not cached either, so they
+        are never read into memory.
+
+    The remaining arguments are those of :class:`HTTPAdapter`.
+
+    Usage::
+
+      >>> import requests
+      >>> from requests.caching import CachingHTTPAdapter, ResponseCache
+      >>> s = requests.Session()
+      >>> cache = ResponseCache(directory='/tmp/http-cache')
+      >>> s.mount('https://', CachingHTTPAdapter(cache, stale_if_error=True))
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["cache", "stale_if_error", "max_body_size"]
+
+    def __init__(
+        self,
+        cache=None,
+        stale_if_error=False,
+        max_body_size=DEFAULT_MAX_BODY_SIZE,
+        **kwargs,
+    ):
+        self.cache = cache if cache is not None else ResponseCache()
+        self.stale_if_error = stale_if_error
+        self.max_body_size = max_body_size
+        super().__init__(**kwargs)
+
+    def cache_key(self, request, method=None):
+        """Returns the key a response to the request is stored under.
+
+        :rtype: str
+        """
+        return f"{method or request.method} {request.url}"
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        """Sends PreparedRequest object, answering it from the cache when it
+        can. Returns Response object.
+
+        Takes the same arguments as :meth:`HTTPAdapter.send`.
+
+        :rtype: requests.Response
+        """
+        kwargs = {
+            "stream": stream,
+            "timeout": timeout,
+            "verify": verify,
+            "cert": cert,
+            "proxies": proxies,
+        }
+        if request.method not in CACHEABLE_METHODS:
+            response = super().send(request, **kwargs)
+            response.from_cache = False
+            if response.status_code < 400:
+                for method in CACHEABLE_METHODS:
+                    self.cache.delete(self.cache_key(request, method))
+            return response
+
+        directives = parse_cache_control(request.headers.get("Cache-Control"))
+        if "no-store" in directives or any(
+            name in request.headers for name in CONDITIONAL_HEADERS
+        ):
+            response = super().send(request, **kwargs)
+            response.from_cache = False
+            return response
+
+        key = self.cache_key(request)
+        entry = self.cache.get(key)
+        if entry is not None and not entry.matches(request):
+            entry = None
+        now = time.time()
+        if (
+            entry is not None
+            and "no-cache" not in directives
+            and entry.is_fresh(now, _seconds(directives, "max-age"))
+        ):
+            return self.build_cached_response(request, entry)
+
+        validators = entry.validators() if entry is not None else None
+        sent = request
+        if validators:
+            sent = request.copy()
+            sent.headers.update(validators)
+
+        try:
+            response = super().send(sent, **kwargs)
+        except (ConnectionError, Timeout):
+            if self._serves_stale(entry, now):
+                return self.build_cached_response(request, entry)
+            raise
+        response_time = time.time()
+        response.request = request
+
+        if response.status_code in ERROR_STATUSES and self._serves_stale(entry, now):
+            response.close()
+            return self.build_cached_response(request, entry)
+
+        if response.status_code == 304 and validators:
+            _drain(response.raw)
+            entry = entry.revalidated(response.raw, response_time)
+            self.cache.set(key, entry)
+            return self.build_cached_response(request, entry, response.raw)
+
+        return self._store(key, request, response, response_time, stream)
+
+    def _serves_stale(self, entry, now):
+        if entry is None or self.stale_if_error is False:
+            return False
+        directives = parse_cache_control(entry.headers.get("Cache-Control"))
+        if "must-revalidate" in directives or "no-store" in directives:
+            return False
+        if self.stale_if_error is True:
+            return True
+        return entry.age(now) - entry.lifetime <= self.stale_if_error
+
+    def _may_fit(self, resp, stream):
+        length = resp.headers.get("Content-Length")
+        if length is None:
+            # An unsized body is only bounded once read. A streamed one is handed
+            # back unread; otherwise it is read whole, as Session.send would, and
+            # stored only if it fits.
+            return not stream
+        try:
+            return int(length) <= self.max_body_size
+        except ValueError:
+            return False
+
+    def _store(self, key, request, response, response_time, stream=False):
+        response.from_cache = False
+        resp = response.raw
+        directives = parse_cache_control(resp.headers.get("Cache-Control"))
+        if "no-store" in directives:
+            self.cache.delete(key)
+            return response
+        if (
+            resp.status not in CACHEABLE_STATUSES
+            or resp.headers.get("Vary", "").strip() == "*"
+            or not (
+                freshness_lifetime(resp.headers, resp.status)
+                or "ETag" in resp.headers
+                or "Last-Modified" in resp.headers
+            )
+        ):
+            return response
+        if request.method != "HEAD" and not self._may_fit(resp, stream):
+            return response
+
+        with _translate_read_errors():
+            body = resp.read(decode_content=False)
+        resp.release_conn()
+        entry = CacheEntry.from_response(request, resp, body, response_time)
+        if len(body) <= self.max_body_size:
+            self.cache.set(key, entry)
+        return self.build_cached_response(request, entry, resp)
+
+    def build_cached_response(self, request, entry, resp=None):
+        """Builds a :class:`Response <requests.Response>` object that replays
+        a cache entry. This should not be called from user code, and is only
+        exposed for use when subclassing the adapter.
+
+        :param request: The :class:`PreparedRequest <PreparedRequest>` being answered.
+        :param entry: The :class:`CacheEntry` to replay.
+        :param resp: (optional) The urllib3 response the entry was stored or
+            revalidated from, whose cookies are still extracted.
+        :rtype: requests.Response
+        """
+        raw = HTTPResponse(
+            body=io.BytesIO(entry.body),
+            headers=entry.headers.copy(),
+            status=entry.status,
+            reason=entry.reason,
+            preload_content=False,
+            decode_content=False,
+            original_response=getattr(resp, "_original_response", None),
+            request_method=request.method,
+            request_url=request.url,
+        )
+        response = self.build_response(request, raw)
+        response.from_cache = resp is None or resp.status == 304
+        return response
+
+
+def _drain(resp):
+    # Reading the (empty) body to its end returns the connection to the pool
+    with _translate_read_errors():
+        resp.read(decode_content=False)
+    resp.release_conn()
@@ -131,9 +131,14 @@ def extract_cookies_to_jar(jar, request, response):
     if not (hasattr(response, "_original_response") and response._original_response):
         return
     # the _original_response field is the wrapped httplib.HTTPResponse object,
+    # whose HTTPMessage holds the headers
+    headers = response._original_response.msg
+    # Without Set-Cookie headers cookielib has nothing to extract
+    if not (headers.get_all("Set-Cookie") or headers.get_all("Set-Cookie2")):
+        return
     req = MockRequest(request)
     # pull out the HTTPMessage with the headers and put it in the mock:
-    res = MockResponse(response._original_response.msg)
+    res = MockResponse(headers)
     jar.extract_cookies(res, req)
 
 
@@ -143,11 +148,19 @@ def get_cookie_header(jar, request):
 
     :rtype: str
     """
+    if _is_empty(jar):
+        return None
     r = MockRequest(request)
     jar.add_cookie_header(r)
     return r.get_new_headers().get("Cookie")
 
 
+def _is_empty(jar):
+    for _ in jar:
+        return False
+    return True
+
+
 def remove_cookie_by_name(cookiejar, name, domain=None, path=None):
     """Unsets a cookie by name, by default over all domains and paths.
 
@@ -196,7 +209,8 @@ class RequestsCookieJar(cookielib.CookieJar, MutableMapping):
         order to resolve naming collisions from using one cookie jar over
         multiple domains.
 
-        .. warning:: operation is O(n), not O(1).
+        .. warning:: operation is O(n) in the number of domains and paths
+            in the jar, not O(1).
         """
         try:
             return self._find_no_duplicates(name, domain, path)
@@ -329,7 +343,8 @@ class RequestsCookieJar(cookielib.CookieJar, MutableMapping):
         exception if there are more than one cookie with name. In that case,
         use the more explicit get() method instead.
 
-        .. warning:: operation is O(n), not O(1).
+        .. warning:: operation is O(n) in the number of domains and paths
+            in the jar, not O(1).
         """
         return self._find_no_duplicates(name)
 
@@ -363,6 +378,22 @@ class RequestsCookieJar(cookielib.CookieJar, MutableMapping):
         else:
             super().update(other)
 
+    def _matching(self, name, domain=None, path=None):
+        """Cookies called name, in the order the jar iterates them, looked up
+        through cookielib's domain -> path -> name index instead of visiting
+        every cookie.
+        """
+        domains = self._cookies
+        if domain is not None:
+            domains = {domain: domains[domain]} if domain in domains else {}
+        for paths in list(domains.values()):
+            if path is not None:
+                paths = {path: paths[path]} if path in paths else {}
+            for names in list(paths.values()):
+                cookie = names.get(name)
+                if cookie is not None:
+                    yield cookie
+
     def _find(self, name, domain=None, path=None):
         """Requests uses this method internally to get cookie values.
 
@@ -375,11 +406,8 @@ class RequestsCookieJar(cookielib.CookieJar, MutableMapping):
         :param path: (optional) string containing path of cookie
         :return: cookie.value
         """
-        for cookie in iter(self):
-            if cookie.name == name:
-                if domain is None or cookie.domain == domain:
-                    if path is None or cookie.path == path:
-                        return cookie.value
+        for cookie in self._matching(name, domain, path):
+            return cookie.value
 
         raise KeyError(f"name={name!r}, domain={domain!r}, path={path!r}")
 
@@ -396,17 +424,14 @@ class RequestsCookieJar(cookielib.CookieJar, MutableMapping):
         :return: cookie.value
         """
         toReturn = None
-        for cookie in iter(self):
-            if cookie.name == name:
-                if domain is None or cookie.domain == domain:
-                    if path is None or cookie.path == path:
-                        if toReturn is not None:
-                            # if there are multiple cookies that meet passed in criteria
-                            raise CookieConflictError(
-                                f"There are multiple cookies with name, {name!r}"
-                            )
-                        # we will eventually return this as long as no cookie conflict
-                        toReturn = cookie.value
+        for cookie in self._matching(name, domain, path):
+            if toReturn is not None:
+                # if there are multiple cookies that meet passed in criteria
+                raise CookieConflictError(
+                    f"There are multiple cookies with name, {name!r}"
+                )
+            # we will eventually return this as long as no cookie conflict
+            toReturn = cookie.value
 
         if toReturn:
             return toReturn
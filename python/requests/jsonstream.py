@@ -0,0 +1,228 @@
+"""
+requests.jsonstream
+~~~~~~~~~~~~~~~~~~~
+
+This module decodes the items of a JSON array while a response body streams
+in, so only the item being decoded is held in memory rather than the whole
+document.
+"""
+
+import codecs
+import re
+
+from .compat import JSONDecodeError
+from .compat import json as complexjson
+from .exceptions import JSONDecodeError as RequestsJSONDecodeError
+from .utils import guess_json_utf
+
+_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[ \t\n\r,\]}]")
+
+
+def iter_json_text(iterator, encoding=None):
+    """Decodes the byte chunks of a JSON body to text.
+
+    Without an encoding, UTF-8, -16 or -32 is detected from the first bytes,
+    as in :meth:`Response.json <requests.Response.json>`.
+    """
+    iterator = iter(iterator)
+    head = b""
+    for chunk in iterator:
+        head += chunk
+        if len(head) >= 4:
+            break
+
+    encoding = encoding or guess_json_utf(head) or "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    text = decoder.decode(head)
+    if text:
+        yield text
+    for chunk in iterator:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+class _Reader:
+    """Scans JSON text chunk by chunk. Only the current chunk is kept, plus
+    the pieces of the value being read."""
+
+    def __init__(self, iterator):
+        self.iterator = iter(iterator)
+        self.buf = ""
+        self.pos = 0
+
+    def error(self, msg):
+        return RequestsJSONDecodeError(msg, self.buf, self.pos)
+
+    def more(self):
+        for chunk in self.iterator:
+            if chunk:
+                self.buf = chunk
+                self.pos = 0
+                return True
+        self.pos = len(self.buf)
+        return False
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it,
+        or an empty string at the end of the document."""
+        while True:
+            match = _NON_WHITESPACE.search(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            expected = " or ".join(repr(c) for c in chars)
+            raise self.error(f"Expecting {expected}")
+        self.pos += 1
+        return char
+
+    def find_key(self, key):
+        """Consumes an object up to the value of ``key``, skipping the values
+        of other keys. Returns False if the object has no such key."""
+        self.expect("{")
+        if self.peek() == "}":
+            return False
+        while True:
+            if self.peek() != '"':
+                raise self.error("Expecting property name enclosed in double quotes")
+            name = _loads(self.read_value())
+            self.expect(":")
+            if name == key:
+                return True
+            self.read_value(keep=False)
+            if self.expect(",}") == "}":
+                return False
+
+    def decode_value(self, decoder):
+        """Decodes the next JSON value. One that ends within the current chunk
+        is decoded in place; one that spans chunks is collected first."""
+        if self.peek():
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except JSONDecodeError:
+                end = None
+            # A number cut off by the end of the chunk decodes as a shorter
+            # one, so the value only counts when what follows can end it
+            if end is not None and _SCALAR_END.match(self.buf, end):
+                self.pos = end
+                return value
+        try:
+            return decoder.decode(self.read_value())
+        except JSONDecodeError as e:
+            raise RequestsJSONDecodeError(e.msg, e.doc, e.pos)
+
+    def read_value(self, keep=True):
+        """Consumes the next JSON value and returns its text, or None when
+        ``keep`` is false and the value is only skipped."""
+        first = self.peek()
+        if not first:
+            raise self.error("Expecting value")
+
+        pieces = []
+        start = i = self.pos
+        depth = 0
+        in_string = False
+        scalar = first not in '[{"'
+        while True:
+            if scalar:
+                match = _SCALAR_END.search(self.buf, i)
+            elif in_string:
+                match = _STRING.search(self.buf, i)
+            else:
+                match = _STRUCTURE.search(self.buf, i)
+
+            if match is None:
+                if keep:
+                    pieces.append(self.buf[start:])
+                if not self.more():
+                    if scalar:
+                        start = self.pos
+                        break
+                    raise self.error("Unterminated value")
+                start = i = 0
+                continue
+
+            if scalar:
+                self.pos = match.start()
+                break
+            char = match.group()
+            i = match.end()
+            if in_string:
+                if char == "\\":
+                    # Skip the escaped character, which may start the next chunk
+                    if i == len(self.buf):
+                        if keep:
+                            pieces.append(self.buf[start:])
+                        if not self.more():
+                            raise self.error("Unterminated string")
+                        start = 0
+                        i = 1
+                    else:
+                        i += 1
+                    continue
+                in_string = False
+            elif char == '"':
+                in_string = True
+                continue
+            elif char in "[{":
+                depth += 1
+                continue
+            else:
+                depth -= 1
+            if depth == 0:
+                self.pos = i
+                break
+
+        if not keep:
+            return None
+        pieces.append(self.buf[start : self.pos])
+        return "".join(pieces)
+
+
+def _loads(text):
+    try:
+        return complexjson.loads(text)
+    except JSONDecodeError as e:
+        raise RequestsJSONDecodeError(e.msg, e.doc, e.pos)
+
+
+def iter_json_items(iterator, path=None, **kwargs):
+    r"""Iterates over the items of a JSON array in a stream of text chunks,
+    decoding each item with ``json.loads`` once it is complete.
+
+    :param path: (optional) object keys leading from the top of the document
+        to the array, as a sequence or a dotted string. By default the
+        document itself is the array. Values before the array are skipped
+        without being decoded, and nothing after it is read.
+    :param \*\*kwargs: Optional arguments that ``json.loads`` takes.
+    :raises requests.exceptions.JSONDecodeError: If the document is not valid
+        json or has no array at ``path``.
+    """
+    if isinstance(path, str):
+        path = path.split(".")
+    decoder = (kwargs.pop("cls", None) or complexjson.JSONDecoder)(**kwargs)
+    reader = _Reader(iterator)
+
+    for key in path or ():
+        if not reader.find_key(key):
+            raise reader.error(f"Key {key!r} not found")
+
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.decode_value(decoder)
+        if reader.expect(",]") == "]":
+            return
@@ -6,6 +6,7 @@ This module contains the primary objects that power Requests.
 """
 
 import datetime
+from contextlib import contextmanager
 
 # Import encoding now, to avoid implicit import later.
 # Implicit import within threads may cause LookupError when standard library is in a ZIP,
@@ -32,7 +33,6 @@ from .compat import (
     Mapping,
     basestring,
     builtin_str,
-    chardet,
     cookielib,
 )
 from .compat import json as complexjson
@@ -51,11 +51,13 @@ from .exceptions import MissingSchema
 from .exceptions import SSLError as RequestsSSLError
 from .exceptions import StreamConsumedError
 from .hooks import default_hooks
+from .jsonstream import iter_json_items, iter_json_text
 from .status_codes import codes
 from .structures import CaseInsensitiveDict
 from .utils import (
     check_header_validity,
     get_auth_from_url,
+    guess_encoding,
     guess_filename,
     guess_json_utf,
     iter_slices,
@@ -78,9 +80,26 @@ REDIRECT_STATI = (
 
 DEFAULT_REDIRECT_LIMIT = 30
 CONTENT_CHUNK_SIZE = 10 * 1024
+DECODED_CHUNK_SIZE = 256 * 1024
 ITER_CHUNK_SIZE = 512
 
 
+@contextmanager
+def _translate_read_errors():
+    """Raises urllib3 errors from reading a response body as requests
+    exceptions."""
+    try:
+        yield
+    except ProtocolError as e:
+        raise ChunkedEncodingError(e)
+    except DecodeError as e:
+        raise ContentDecodingError(e)
+    except ReadTimeoutError as e:
+        raise ConnectionError(e)
+    except SSLError as e:
+        raise RequestsSSLError(e)
+
+
 class RequestEncodingMixin:
     @property
     def path_url(self):
@@ -788,13 +807,9 @@ class Response:
 
     @property
     def apparent_encoding(self):
-        """The apparent encoding, provided by the charset_normalizer or chardet libraries."""
-        if chardet is not None:
-            return chardet.detect(self.content)["encoding"]
-        else:
-            # If no character detection library is available, we'll fall back
-            # to a standard Python utf-8 str.
-            return "utf-8"
+        """The apparent encoding, from the start of the content or provided by
+        the charset_normalizer or chardet libraries."""
+        return guess_encoding(self.content, self.headers.get("content-type"), self.url)
 
     def iter_content(self, chunk_size=1, decode_unicode=False):
         """Iterates over the response data.  When stream=True is set on the
@@ -816,16 +831,8 @@ class Response:
         def generate():
             # Special case for urllib3.
             if hasattr(self.raw, "stream"):
-                try:
+                with _translate_read_errors():
                     yield from self.raw.stream(chunk_size, decode_content=True)
-                except ProtocolError as e:
-                    raise ChunkedEncodingError(e)
-                except DecodeError as e:
-                    raise ContentDecodingError(e)
-                except ReadTimeoutError as e:
-                    raise ConnectionError(e)
-                except SSLError as e:
-                    raise RequestsSSLError(e)
             else:
                 # Standard file-like object.
                 while True:
@@ -864,29 +871,65 @@ class Response:
         .. note:: This method is not reentrant safe.
         """
 
+        # The partial line at the end of the last chunk, and the earlier pieces
+        # of a line spanning several chunks. They are joined once the line's
+        # end arrives, so each chunk is scanned once whatever the line length.
         pending = None
+        parts = []
+        # Trailing characters of a partial line that may start a delimiter
+        # finishing in the next chunk
+        carry = len(delimiter) - 1 if delimiter else 0
 
         for chunk in self.iter_content(
             chunk_size=chunk_size, decode_unicode=decode_unicode
         ):
-            if pending is not None:
-                chunk = pending + chunk
+            if not chunk:
+                continue
+
+            if carry and pending is not None:
+                while len(pending) < carry and parts:
+                    pending = parts.pop() + pending
+                chunk = pending[-carry:] + chunk
+                pending = pending[:-carry] or (parts.pop() if parts else None)
 
             if delimiter:
                 lines = chunk.split(delimiter)
             else:
                 lines = chunk.splitlines()
 
-            if lines and lines[-1] and chunk and lines[-1][-1] == chunk[-1]:
-                pending = lines.pop()
-            else:
-                pending = None
+            ends_open = lines[-1] and lines[-1][-1] == chunk[-1]
+            if ends_open and len(lines) == 1:
+                if pending is not None:
+                    parts.append(pending)
+                pending = chunk
+                continue
+
+            if parts:
+                parts.extend((pending, lines[0]))
+                lines[0] = chunk[:0].join(parts)
+                parts = []
+            elif pending is not None:
+                lines[0] = pending + lines[0]
+            pending = lines.pop() if ends_open else None
 
             yield from lines
 
+        if parts:
+            parts.append(pending)
+            pending = pending[:0].join(parts)
         if pending is not None:
             yield pending
 
+    def _reads_whole_body(self):
+        """Whether the body can be read from urllib3 in one call: nothing has
+        been read yet and it needs no decoding."""
+        return (
+            hasattr(self.raw, "stream")
+            and self.raw.tell() == 0
+            and self.headers.get("content-encoding", "identity").lower()
+            == "identity"
+        )
+
     @property
     def content(self):
         """Content of the response, in bytes."""
@@ -898,6 +941,17 @@ class Response:
 
             if self.status_code == 0 or self.raw is None:
                 self._content = None
+            elif self._reads_whole_body():
+                # Read in one call: with a Content-Length the body goes
+                # straight into a single bytes object of that size instead of
+                # being held twice, as chunks and as their join.
+                with _translate_read_errors():
+                    self._content = self.raw.read(decode_content=False) or b""
+            elif "content-encoding" in self.headers:
+                # Decoded in large chunks, which are copied once by the join.
+                self._content = (
+                    b"".join(self.iter_content(DECODED_CHUNK_SIZE)) or b""
+                )
             else:
                 self._content = b"".join(self.iter_content(CONTENT_CHUNK_SIZE)) or b""
 
@@ -910,8 +964,8 @@ class Response:
     def text(self):
         """Content of the response, in unicode.
 
-        If Response.encoding is None, encoding will be guessed using
-        ``charset_normalizer`` or ``chardet``.
+        If Response.encoding is None, encoding will be guessed from the start
+        of the content, using ``charset_normalizer`` or ``chardet`` when needed.
 
         The encoding of the response content is determined based solely on HTTP
         headers, following RFC 2616 to the letter. If you can take advantage of
@@ -977,6 +1031,23 @@ class Response:
             # This aliases json.JSONDecodeError and simplejson.JSONDecodeError
             raise RequestsJSONDecodeError(e.msg, e.doc, e.pos)
 
+    def iter_json(self, path=None, chunk_size=CONTENT_CHUNK_SIZE, **kwargs):
+        r"""Iterates over the items of a JSON array in the response, decoding
+        each one as soon as it has arrived. With stream=True set on the
+        request, only the item being decoded is held in memory rather than
+        the whole body.
+
+        :param path: (optional) object keys leading from the top of the body
+            to the array, as a sequence or a dotted string, e.g.
+            ``"messages"``. By default the body itself is the array.
+        :param chunk_size: (optional) number of bytes read at a time.
+        :param \*\*kwargs: Optional arguments that ``json.loads`` takes.
+        :raises requests.exceptions.JSONDecodeError: If the response body does not
+            contain valid json or has no array at ``path``.
+        """
+        text = iter_json_text(self.iter_content(chunk_size), self.encoding)
+        yield from iter_json_items(text, path, **kwargs)
+
     @property
     def links(self):
         """Returns the parsed header links of the response, if any."""
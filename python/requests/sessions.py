@@ -5,15 +5,15 @@ requests.sessions
 This module provides a Session object to manage and persist settings across
 requests (cookies, auth, proxies).
 """
-import os
 import sys
 import time
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
 
 from ._internal_utils import to_native_string
 from .adapters import HTTPAdapter
-from .auth import _basic_auth_str
+from .auth import HTTPBasicAuth, _basic_auth_str
 from .compat import Mapping, cookielib, urljoin, urlparse
 from .cookies import (
     RequestsCookieJar,
@@ -35,12 +35,15 @@ from .models import (  # noqa: F401
     REDIRECT_STATI,
     PreparedRequest,
     Request,
+    RequestEncodingMixin,
 )
 from .status_codes import codes
 from .structures import CaseInsensitiveDict
 from .utils import (  # noqa: F401
     DEFAULT_PORTS,
+    check_header_validity,
     default_headers,
+    environment_cache,
     get_auth_from_url,
     get_environ_proxies,
     get_netrc_auth,
@@ -57,6 +60,14 @@ if sys.platform == "win32":
 else:
     preferred_clock = time.time
 
+# Requests in flight at once in Session.batch and Session.map.
+DEFAULT_BATCH_WORKERS = 10
+
+# Send arguments Session.batch applies to every request.
+BATCH_SEND_KWARGS = frozenset(
+    ("timeout", "allow_redirects", "proxies", "stream", "verify", "cert")
+)
+
 
 def merge_setting(request_setting, session_setting, dict_class=OrderedDict):
     """Determines appropriate setting for a given request, taking into account
@@ -76,7 +87,11 @@ def merge_setting(request_setting, session_setting, dict_class=OrderedDict):
     ):
         return request_setting
 
-    merged_setting = dict_class(to_key_val_list(session_setting))
+    if isinstance(session_setting, dict_class):
+        # Copied wholesale, e.g. a session's CaseInsensitiveDict headers
+        merged_setting = dict_class(session_setting)
+    else:
+        merged_setting = dict_class(to_key_val_list(session_setting))
     merged_setting.update(to_key_val_list(request_setting))
 
     # Remove keys that are set to None. Extract keys first to avoid altering
@@ -295,7 +310,7 @@ class SessionRedirectMixin:
             del headers["Authorization"]
 
         # .netrc might have more auth for us on our new host.
-        new_auth = get_netrc_auth(url) if self.trust_env else None
+        new_auth = environment_cache.netrc_auth(url) if self.trust_env else None
         if new_auth is not None:
             prepared_request.prepare_auth(new_auth)
 
@@ -478,7 +493,7 @@ class Session(SessionRedirectMixin):
         # Set environment's basic authentication if not explicitly set.
         auth = request.auth
         if self.trust_env and not auth and not self.auth:
-            auth = get_netrc_auth(request.url)
+            auth = environment_cache.netrc_auth(request.url)
 
         p = PreparedRequest()
         p.prepare(
@@ -590,6 +605,115 @@ class Session(SessionRedirectMixin):
 
         return resp
 
+    def template(self, method, url, params=None, headers=None, auth=None, hooks=None):
+        """Returns a :class:`RequestTemplate` for repeated calls to one endpoint.
+
+        The method, URL, static query parameters, merged headers, auth and
+        hooks are validated and prepared once. Later changes to this
+        session's headers, auth or hooks are not picked up by the template;
+        cookies, proxies and TLS settings are read on every call.
+
+        :param method: method for the template.
+        :param url: URL for the template.
+        :param params: (optional) static query parameters.
+        :param headers: (optional) static headers, merged over the session's.
+        :param auth: (optional) Auth tuple or callable.
+        :param hooks: (optional) Dictionary mapping hook name to hooks.
+        :rtype: requests.sessions.RequestTemplate
+        """
+        return RequestTemplate(self, method, url, params, headers, auth, hooks)
+
+    def batch(self, requests, max_workers=DEFAULT_BATCH_WORKERS, **kwargs):
+        """Sends many requests concurrently on this session's connection pools.
+
+        Yields ``(index, result)`` pairs as responses complete, where index is
+        the request's position in ``requests`` and result is either a
+        :class:`Response` or the exception raised while sending it, so one
+        failure does not abort the rest. Closing the generator early cancels
+        the requests that have not started yet.
+
+        The adapters' pools are grown to ``max_workers`` connections per host
+        first, so concurrent connections are reused instead of discarded.
+
+        :param requests: iterable of :class:`Request` or :class:`PreparedRequest`
+            objects; Requests are prepared with this session's settings.
+        :param max_workers: (optional) number of requests in flight at once.
+        :param kwargs: (optional) ``timeout``, ``allow_redirects``, ``proxies``,
+            ``stream``, ``verify`` or ``cert``, applied to every request.
+        :rtype: generator of (int, requests.Response or Exception) tuples
+        """
+        unknown = set(kwargs) - BATCH_SEND_KWARGS
+        if unknown:
+            raise TypeError(f"Unexpected batch arguments: {', '.join(sorted(unknown))}")
+        items = list(requests)
+        if not items:
+            return
+        workers = max(1, min(max_workers, len(items)))
+        self._grow_pools(items, workers)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._send_batch_item, item, kwargs): index
+                for index, item in enumerate(items)
+            }
+            try:
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = e
+                    yield futures[future], result
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def map(self, requests, max_workers=DEFAULT_BATCH_WORKERS, **kwargs):
+        """Sends many requests concurrently, like :meth:`batch`, and returns
+        the results in the order of ``requests``.
+
+        :rtype: list of requests.Response or Exception
+        """
+        items = list(requests)
+        results = [None] * len(items)
+        for index, result in self.batch(items, max_workers, **kwargs):
+            results[index] = result
+        return results
+
+    def _grow_pools(self, items, workers):
+        adapters = {}
+        for item in items:
+            try:
+                adapter = self.get_adapter(item.url)
+            except (AttributeError, InvalidSchema):
+                # Reported for that request when it is sent
+                continue
+            adapters[id(adapter)] = adapter
+        for adapter in adapters.values():
+            ensure_pool_size = getattr(adapter, "ensure_pool_size", None)
+            if ensure_pool_size is not None:
+                ensure_pool_size(workers)
+
+    def _send_batch_item(self, item, kwargs):
+        if isinstance(item, Request):
+            prep = self.prepare_request(item)
+        elif isinstance(item, PreparedRequest):
+            prep = item
+        else:
+            raise TypeError(f"Expected a Request or PreparedRequest, got {type(item).__name__}")
+        settings = self.merge_environment_settings(
+            prep.url,
+            dict(kwargs.get("proxies") or {}),
+            kwargs.get("stream"),
+            kwargs.get("verify"),
+            kwargs.get("cert"),
+        )
+        send_kwargs = {
+            "timeout": kwargs.get("timeout"),
+            "allow_redirects": kwargs.get("allow_redirects", True),
+        }
+        send_kwargs.update(settings)
+        return self.send(prep, **send_kwargs)
+
     def get(self, url, **kwargs):
         r"""Sends a GET request. Returns :class:`Response` object.
 
@@ -757,18 +881,14 @@ class Session(SessionRedirectMixin):
         if self.trust_env:
             # Set environment's proxies.
             no_proxy = proxies.get("no_proxy") if proxies is not None else None
-            env_proxies = get_environ_proxies(url, no_proxy=no_proxy)
+            env_proxies = environment_cache.environ_proxies(url, no_proxy=no_proxy)
             for k, v in env_proxies.items():
                 proxies.setdefault(k, v)
 
             # Look for requests environment configuration
             # and be compatible with cURL.
             if verify is True or verify is None:
-                verify = (
-                    os.environ.get("REQUESTS_CA_BUNDLE")
-                    or os.environ.get("CURL_CA_BUNDLE")
-                    or verify
-                )
+                verify = environment_cache.ca_bundle() or verify
 
         # Merge all the kwargs.
         proxies = merge_setting(proxies, self.proxies)
@@ -816,6 +936,124 @@ class Session(SessionRedirectMixin):
             setattr(self, attr, value)
 
 
+class RequestTemplate:
+    """A request to one endpoint prepared once and filled in per call.
+
+    Created with :meth:`Session.template`. Each call only copies the
+    prepared headers, appends variable query parameters, prepares the body
+    and attaches cookies, skipping the cookie jar entirely when there are
+    none::
+
+        post = session.template("POST", "https://slack.com/api/chat.postMessage")
+        post.send(json={"channel": "C0123", "text": "hi"}, timeout=10)
+    """
+
+    def __init__(self, session, method, url, params=None, headers=None, auth=None, hooks=None):
+        self.session = session
+
+        # Set environment's basic authentication if not explicitly set.
+        if session.trust_env and not auth and not session.auth:
+            auth = environment_cache.netrc_auth(url)
+        auth = merge_setting(auth, session.auth)
+
+        base = PreparedRequest()
+        base.prepare_method(method.upper())
+        base.prepare_url(url, params or {})
+        base.prepare_headers(
+            merge_setting(headers, session.headers, dict_class=CaseInsensitiveDict)
+        )
+        # Basic auth (given or embedded in the URL) only sets a header, so it is
+        # applied once; any other auth runs on every request.
+        self.auth = None
+        if auth is None or isinstance(auth, (tuple, HTTPBasicAuth)):
+            had_length = "Content-Length" in base.headers
+            base.prepare_auth(auth, url)
+            if not had_length:
+                # Set by prepare_auth for the missing body, prepared per call instead
+                base.headers.pop("Content-Length", None)
+        else:
+            self.auth = auth
+        base.prepare_hooks(merge_hooks(hooks, session.hooks))
+        self.method = base.method
+        self.url = base.url
+        self.headers = base.headers
+        self.hooks = base.hooks
+        # Variable params go before any fragment
+        self._url_base, sep, self._fragment = self.url.partition("#")
+        self._fragment = sep + self._fragment
+        self._query_sep = "&" if urlparse(self._url_base).query else "?"
+
+    def prepare(self, params=None, data=None, json=None, headers=None, files=None, cookies=None):
+        """Builds a :class:`PreparedRequest <PreparedRequest>` from the template.
+
+        :rtype: requests.PreparedRequest
+        """
+        p = PreparedRequest()
+        p.method = self.method
+        url = self.url
+        if params:
+            enc_params = RequestEncodingMixin._encode_params(params)
+            if enc_params:
+                url = requote_uri(
+                    f"{self._url_base}{self._query_sep}{enc_params}{self._fragment}"
+                )
+        p.url = url
+        p.headers = self.headers.copy()
+        if headers:
+            for name, value in headers.items():
+                if value is None:
+                    p.headers.pop(name, None)
+                else:
+                    check_header_validity((name, value))
+                    p.headers[to_native_string(name)] = value
+
+        session_cookies = self.session.cookies
+        if cookies or len(session_cookies):
+            if not isinstance(cookies, cookielib.CookieJar):
+                cookies = cookiejar_from_dict(cookies or {})
+            p.prepare_cookies(
+                merge_cookies(merge_cookies(RequestsCookieJar(), session_cookies), cookies)
+            )
+        else:
+            p._cookies = RequestsCookieJar()
+
+        p.prepare_body(data, files, json)
+        if self.auth is not None:
+            p.prepare_auth(self.auth, url)
+        p.hooks = self.hooks
+        return p
+
+    def send(
+        self,
+        params=None,
+        data=None,
+        json=None,
+        headers=None,
+        files=None,
+        cookies=None,
+        timeout=None,
+        allow_redirects=True,
+        proxies=None,
+        stream=None,
+        verify=None,
+        cert=None,
+    ):
+        """Prepares and sends a request from the template, taking the same
+        per-request arguments as :meth:`Session.request`.
+
+        :rtype: requests.Response
+        """
+        prep = self.prepare(params, data, json, headers, files, cookies)
+        settings = self.session.merge_environment_settings(
+            prep.url, proxies or {}, stream, verify, cert
+        )
+        settings["timeout"] = timeout
+        settings["allow_redirects"] = allow_redirects
+        return self.session.send(prep, **settings)
+
+    __call__ = send
+
+
 def session():
     """
     Returns a :class:`Session` for context-management.
@@ -5,7 +5,7 @@ requests.structures
 Data structures that power Requests.
 """
 
-from collections import OrderedDict
+from collections.abc import ItemsView, ValuesView
 
 from .compat import Mapping, MutableMapping
 
@@ -37,49 +37,122 @@ class CaseInsensitiveDict(MutableMapping):
     behavior is undefined.
     """
 
+    __slots__ = ("_keys", "_values", "_shared")
+
     def __init__(self, data=None, **kwargs):
-        self._store = OrderedDict()
-        if data is None:
-            data = {}
-        self.update(data, **kwargs)
+        # Both keyed by the lowercased key: the case of the last key set,
+        # and the value. Copies share them until either copy is changed.
+        self._keys = {}
+        self._values = {}
+        self._shared = False
+        if data:
+            self.update(data)
+        if kwargs:
+            self.update(kwargs)
+
+    def _unshare(self):
+        self._keys = self._keys.copy()
+        self._values = self._values.copy()
+        self._shared = False
 
     def __setitem__(self, key, value):
-        # Use the lowercased key for lookups, but store the actual
-        # key alongside the value.
-        self._store[key.lower()] = (key, value)
+        if self._shared:
+            self._unshare()
+        # Use the lowercased key for lookups, but remember the actual key.
+        lower = key.lower()
+        self._keys[lower] = key
+        self._values[lower] = value
 
     def __getitem__(self, key):
-        return self._store[key.lower()][1]
+        return self._values[key.lower()]
 
     def __delitem__(self, key):
-        del self._store[key.lower()]
+        if self._shared:
+            self._unshare()
+        lower = key.lower()
+        del self._values[lower]
+        del self._keys[lower]
+
+    def __contains__(self, key):
+        return key.lower() in self._values
 
     def __iter__(self):
-        return (casedkey for casedkey, mappedvalue in self._store.values())
+        return iter(self._keys.values())
 
     def __len__(self):
-        return len(self._store)
+        return len(self._values)
+
+    def get(self, key, default=None):
+        return self._values.get(key.lower(), default)
+
+    def items(self):
+        return _ItemsView(self)
+
+    def values(self):
+        return _ValuesView(self)
+
+    def update(self, other=(), /, **kwargs):
+        if self._shared:
+            self._unshare()
+        keys, values = self._keys, self._values
+        if isinstance(other, CaseInsensitiveDict):
+            keys.update(other._keys)
+            values.update(other._values)
+        else:
+            if type(other) is dict:
+                other = other.items()
+            elif isinstance(other, Mapping) or hasattr(other, "keys"):
+                # Not items(): it may list a repeated header once per value
+                other = [(key, other[key]) for key in other.keys()]
+            for key, value in other:
+                lower = key.lower()
+                keys[lower] = key
+                values[lower] = value
+        if kwargs:
+            self.update(kwargs)
 
     def lower_items(self):
         """Like iteritems(), but with all lowercase keys."""
-        return ((lowerkey, keyval[1]) for (lowerkey, keyval) in self._store.items())
+        return iter(self._values.items())
 
     def __eq__(self, other):
         if isinstance(other, Mapping):
-            other = CaseInsensitiveDict(other)
+            other = other if isinstance(other, CaseInsensitiveDict) else CaseInsensitiveDict(other)
         else:
             return NotImplemented
         # Compare insensitively
-        return dict(self.lower_items()) == dict(other.lower_items())
+        return self._values == other._values
 
     # Copy is required
     def copy(self):
-        return CaseInsensitiveDict(self._store.values())
+        copy = CaseInsensitiveDict.__new__(CaseInsensitiveDict)
+        copy._keys = self._keys
+        copy._values = self._values
+        copy._shared = self._shared = True
+        return copy
+
+    def __reduce__(self):
+        return CaseInsensitiveDict, (list(self.items()),)
 
     def __repr__(self):
         return str(dict(self.items()))
 
 
+class _ItemsView(ItemsView):
+    __slots__ = ()
+
+    def __iter__(self):
+        mapping = self._mapping
+        return zip(mapping._keys.values(), mapping._values.values())
+
+
+class _ValuesView(ValuesView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return iter(self._mapping._values.values())
+
+
 class LookupDict(dict):
     """Dictionary lookup object."""
 
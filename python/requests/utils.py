@@ -15,6 +15,7 @@ import socket
 import struct
 import sys
 import tempfile
+import time
 import warnings
 import zipfile
 from collections import OrderedDict
@@ -35,6 +36,7 @@ from .compat import (
     Mapping,
     basestring,
     bytes,
+    chardet,
     getproxies,
     getproxies_environment,
     integer_types,
@@ -60,6 +62,27 @@ from .structures import CaseInsensitiveDict
 
 NETRC_FILES = (".netrc", "_netrc")
 
+# Environment variables consulted for proxies, CA bundles and netrc auth. Their values
+# form the generation stamp of the EnvironmentCache.
+ENVIRONMENT_KEYS = (
+    "http_proxy",
+    "HTTP_PROXY",
+    "https_proxy",
+    "HTTPS_PROXY",
+    "all_proxy",
+    "ALL_PROXY",
+    "no_proxy",
+    "NO_PROXY",
+    "REQUEST_METHOD",
+    "REQUESTS_CA_BUNDLE",
+    "CURL_CA_BUNDLE",
+    "NETRC",
+    "HOME",
+)
+
+# Seconds between checks of the netrc file for changes.
+NETRC_RECHECK_INTERVAL = 5.0
+
 DEFAULT_CA_BUNDLE_PATH = certs.where()
 
 DEFAULT_PORTS = {"http": 80, "https": 443}
@@ -835,6 +858,121 @@ def get_environ_proxies(url, no_proxy=None):
         return getproxies()
 
 
+def _netrc_stamp():
+    """Return (path, mtime, size) of the netrc file that would be used, or None."""
+    netrc_file = os.environ.get("NETRC")
+    if netrc_file is not None:
+        netrc_locations = (netrc_file,)
+    else:
+        netrc_locations = (f"~/{f}" for f in NETRC_FILES)
+
+    for f in netrc_locations:
+        try:
+            st = os.stat(os.path.expanduser(f))
+        except (KeyError, OSError):
+            continue
+        return (f, st.st_mtime_ns, st.st_size)
+    return None
+
+
+class EnvironmentCache:
+    """Memoizes environment proxy and netrc resolution per (scheme, host).
+
+    Each lookup compares the values of :data:`ENVIRONMENT_KEYS` with those the
+    cache was filled under, which costs a handful of dict lookups instead of
+    scanning ``os.environ``. The netrc file is re-checked at most every
+    :data:`NETRC_RECHECK_INTERVAL` seconds, so steady-state requests touch
+    neither the filesystem nor the environment at large. Any change empties
+    the cache; :meth:`clear` does so explicitly, e.g. after changing system
+    proxy settings.
+    """
+
+    #: Entries kept per table before it is emptied.
+    max_entries = 256
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._stamp = None
+        self._netrc_stamp = None
+        self._netrc_checked = None
+        self._proxies = {}
+        self._netrc = {}
+        self._ca_bundle = None
+
+    def _check(self):
+        stamp = tuple(map(os.environ.get, ENVIRONMENT_KEYS))
+        if stamp != self._stamp:
+            self._proxies = {}
+            self._netrc = {}
+            self._netrc_checked = None
+            self._ca_bundle = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get(
+                "CURL_CA_BUNDLE"
+            )
+            self._stamp = stamp
+
+    def _check_netrc(self):
+        now = time.monotonic()
+        if (
+            self._netrc_checked is not None
+            and now - self._netrc_checked < NETRC_RECHECK_INTERVAL
+        ):
+            return
+        stamp = _netrc_stamp()
+        if stamp != self._netrc_stamp:
+            self._netrc = {}
+            self._netrc_stamp = stamp
+        self._netrc_checked = now
+
+    def environ_proxies(self, url, no_proxy=None):
+        """Cached :func:`get_environ_proxies`. The result must not be modified.
+
+        :rtype: dict
+        """
+        self._check()
+        parsed = urlparse(url)
+        key = (parsed.scheme, parsed.netloc, no_proxy)
+        proxies = self._proxies.get(key)
+        if proxies is None:
+            proxies = get_environ_proxies(url, no_proxy=no_proxy)
+            if len(self._proxies) >= self.max_entries:
+                self._proxies = {}
+            self._proxies[key] = proxies
+        return proxies
+
+    def netrc_auth(self, url):
+        """Cached :func:`get_netrc_auth`.
+
+        :rtype: tuple or None
+        """
+        self._check()
+        self._check_netrc()
+        if self._netrc_stamp is None:
+            return None
+        host = urlparse(url).netloc.split(":")[0]
+        try:
+            return self._netrc[host]
+        except KeyError:
+            auth = get_netrc_auth(url)
+            if len(self._netrc) >= self.max_entries:
+                self._netrc = {}
+            self._netrc[host] = auth
+            return auth
+
+    def ca_bundle(self):
+        """CA bundle configured through the environment, or None.
+
+        :rtype: str or None
+        """
+        self._check()
+        return self._ca_bundle
+
+
+#: Process-wide cache used by :class:`Session <requests.sessions.Session>`.
+environment_cache = EnvironmentCache()
+
+
 def select_proxy(url, proxies):
     """Select a proxy for the url, if applicable.
 
@@ -878,8 +1016,9 @@ def resolve_proxies(request, proxies, trust_env=True):
     no_proxy = proxies.get("no_proxy")
     new_proxies = proxies.copy()
 
-    if trust_env and not should_bypass_proxies(url, no_proxy=no_proxy):
-        environ_proxies = get_environ_proxies(url, no_proxy=no_proxy)
+    if trust_env:
+        # Empty when the URL bypasses proxies
+        environ_proxies = environment_cache.environ_proxies(url, no_proxy=no_proxy)
 
         proxy = environ_proxies.get(scheme, environ_proxies.get("all"))
 
@@ -986,6 +1125,104 @@ def guess_json_utf(data):
     return None
 
 
+# Bytes of a body searched for a <meta> charset or an XML declaration, as in
+# the HTML standard's prescan.
+ENCODING_PRESCAN_SIZE = 1024
+# Bytes of a body handed to charset_normalizer or chardet.
+ENCODING_SAMPLE_SIZE = 16 * 1024
+# Detected encodings remembered per (media type, host).
+ENCODING_CACHE_SIZE = 256
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_DECLARED_ENCODING_RE = re.compile(
+    rb"""<\?xml[^>]*?encoding=["']?([\w.:-]+)|<meta[^>]*?charset=["']?([\w.:-]+)""",
+    flags=re.I,
+)
+_detected_encodings = {}
+
+
+def _declared_encoding(sample):
+    """Returns the encoding named by a <meta> charset or an XML declaration
+    at the start of a document, if Python knows it."""
+    match = _DECLARED_ENCODING_RE.search(sample[:ENCODING_PRESCAN_SIZE])
+    if match is None:
+        return None
+    name = (match.group(1) or match.group(2)).decode("ascii")
+    try:
+        codec = codecs.lookup(name)
+    except LookupError:
+        return None
+    # A document that can declare its encoding in ASCII is not UTF-16
+    if codec.name.startswith("utf-16"):
+        return "utf-8"
+    return name
+
+
+def guess_encoding(content, content_type=None, url=None):
+    """Returns the apparent encoding of a response body.
+
+    Byte order marks, JSON, declarations in HTML and XML, ASCII and valid
+    UTF-8 are recognised from the start of the body. Only other bodies go
+    to charset_normalizer or chardet, which look at the first
+    ``ENCODING_SAMPLE_SIZE`` bytes, and their answer is reused for later
+    bodies of the same media type from the same host.
+
+    :param content: the body, in bytes.
+    :param content_type: (optional) the Content-Type header.
+    :param url: (optional) the URL the body came from.
+    :rtype: str
+    """
+    sample = content[:ENCODING_SAMPLE_SIZE]
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    media_type = ""
+    if content_type:
+        media_type = _parse_content_type_header(content_type)[0].lower()
+    if "json" in media_type or (
+        not media_type and sample.lstrip()[:1] in (b"{", b"[")
+    ):
+        encoding = guess_json_utf(sample)
+        if encoding is not None:
+            return encoding
+
+    encoding = _declared_encoding(sample)
+    if encoding is not None:
+        return encoding
+
+    if sample.isascii() and (len(content) == len(sample) or content.isascii()):
+        return "ascii"
+    try:
+        # The sample may end partway through a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample)
+    except UnicodeDecodeError:
+        pass
+    else:
+        return "utf-8"
+
+    if chardet is None:
+        # If no character detection library is available, we'll fall back
+        # to a standard Python utf-8 str.
+        return "utf-8"
+    key = (media_type, urlparse(url).hostname if url else None)
+    encoding = _detected_encodings.get(key)
+    if encoding is None:
+        encoding = chardet.detect(sample)["encoding"]
+        if encoding is None:
+            return None
+        if len(_detected_encodings) >= ENCODING_CACHE_SIZE:
+            _detected_encodings.pop(next(iter(_detected_encodings)), None)
+        _detected_encodings[key] = encoding
+    return encoding
+
+
 def prepend_scheme_if_needed(url, new_scheme):
     """Given a URL that may or may not have a scheme, prepend the given scheme.
     Does not replace a present scheme with the one provided as an argument.
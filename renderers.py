@@ -0,0 +1,170 @@
+import logging
+
+from compare import top_movers
+
+logger = logging.getLogger()
+
+# Report styles by name, each render(data, currency_table, currencies, config, title) -> text
+RENDERERS = {}
+
+
+def renderer(name):
+    def register(render):
+        RENDERERS[name] = render
+        return render
+    return register
+
+
+@renderer("bill_cycle")
+def render_bill_cycle(data, currency_table, currencies, config, title=None):
+    """
+    Month bill cycle with the services utilised, tax, forecast and top movers
+    """
+    end_date = data.end_date
+    message = f"📊 *{end_date.strftime('%B')}* Month Bill Cycle\n\n"
+    if title:
+        message = f"📊 *{title}* - *{end_date.strftime('%B')}* Month Bill Cycle\n\n"
+
+    if data.services:
+        message += "*📅 Services utilised*\n"
+        amounts = currency_table.format_column([cost for _, cost in data.services], currencies)
+        for (service, cost), amount in zip(data.services, amounts):
+            logger.debug(f"Monthly cost for {service}: {amount}")
+            message += f"▹ {service} - 💵{amount}\n"
+    else:
+        message += "*📅 Monthly Service Breakdown*\nNo costs incurred in this period 📉\n"
+
+    monthly_total_text = currency_table.format(data.total, currencies)
+    logger.info(f"Monthly total cost: {monthly_total_text}")
+
+    message += "\n*📌 SUMMARY*\n"
+    message += f"\n*Service Total:* 💵{monthly_total_text}"
+    if config.tax:
+        message += f"\n▹ Tax - 💵{currency_table.format(config.tax, currencies)}\n"
+    else:
+        message += "\n"
+    total_with_tax_text = currency_table.format(data.total + config.tax, currencies)
+    message += f"▹ *Total Cost incurred till last bill cycle* - 💵{total_with_tax_text}\n"
+    if data.forecast is not None:
+        forecast = data.forecast
+        projected, lower, upper = currency_table.format_column(
+            [round(forecast.projected), round(forecast.lower), round(forecast.upper)], currencies
+        )
+        message += f"▹ *Projected month end* - 💵{projected}\n   _likely between {lower} and {upper}_\n"
+
+    # Biggest changes against the previous period
+    comparison = data.comparison
+    movers = top_movers(comparison) if comparison is not None else []
+    if movers:
+        message += f"\n*🔀 TOP MOVERS* _{comparison.label}_\n"
+        amounts = currency_table.format_column([abs(comparison.delta[i]) for i in movers], currencies)
+        for i, amount in zip(movers, amounts):
+            arrow = "🔺" if comparison.delta[i] > 0 else "🔻"
+            percent = comparison.percent[i]
+            change = f" ({percent:+,.0f}%)" if percent is not None else " (new)"
+            message += f"{arrow} {comparison.services[i]} - 💵{amount}{change}\n"
+
+    if data.trends:
+        message += "\n*📈 TRENDS*\n"
+        amounts = currency_table.format_column([current for _, current, _, _, _ in data.trends], currencies)
+        for (label, _, _, delta, percent), amount in zip(data.trends, amounts):
+            if percent is not None:
+                change = f" ({percent:+,.0f}%)"
+            else:
+                change = " (new)" if delta else ""
+            message += f"▹ {label} - 💵{amount}{change}\n"
+
+    return message
+
+
+@renderer("detailed")
+def render_detailed(data, currency_table, currencies, config, title=None):
+    """
+    Today's spending, the window's breakdown and a summary with the daily average
+    """
+    end_date = data.end_date
+    message = "📊 *AWS COST DETAILS REPORT - " + end_date.strftime('%B %d, %Y') + "*\n\n"
+    if title:
+        message = f"📊 *{title}* - *AWS COST DETAILS REPORT - {end_date.strftime('%B %d, %Y')}*\n\n"
+
+    message += "*🕒 TODAY'S SPENDING DETAILS*\n"
+    message += f"_{end_date.strftime('%A')}, {end_date.strftime('%B %d, %Y')}_\n\n"
+    if data.today_services:
+        amounts = currency_table.format_column([cost for _, cost in data.today_services], currencies)
+        for (service, cost), amount in zip(data.today_services, amounts):
+            message += f"- {service} - {amount}\n"
+    else:
+        message += "No costs incurred today\n"
+    today_total_text = currency_table.format(data.today_total, currencies)
+    message += f"\n*Today's Total:* {today_total_text}\n\n"
+
+    message += f"*📅 {config.window_days}-DAY COST BREAKDOWN*\n"
+    message += f"_{data.start_date.strftime('%B %d')} - {end_date.strftime('%B %d, %Y')}_\n\n"
+    if data.services:
+        amounts = currency_table.format_column([cost for _, cost in data.services], currencies)
+        for (service, cost), amount in zip(data.services, amounts):
+            message += f"- {service} - {amount}\n"
+    else:
+        message += "No costs incurred in this period\n"
+    total_text = currency_table.format(data.total, currencies)
+    message += f"\n*Monthly Total:* {total_text}\n\n"
+
+    message += "*📌 SUMMARY*\n\n"
+    message += f"- Today's Spending - {today_total_text}\n"
+    message += f"- Last {config.window_days} Days Total - {total_text}\n"
+    message += f"- Daily Average Cost - {currency_table.format(data.daily_average, currencies)}"
+    return message
+
+
+@renderer("console")
+def render_console(data, currency_table, currencies, config, title=None):
+    """
+    Plain terminal output for cli.py
+    """
+    today, start = data.end_date.strftime('%Y-%m-%d'), data.start_date.strftime('%Y-%m-%d')
+    today_text = currency_table.format(data.today_total, currencies)
+    total_text = currency_table.format(data.total, currencies)
+    lines = [f"📊 AWS COST DETAILS REPORT - {today}", f"⏰ TODAY'S SPENDING DETAILS\n{today}"]
+    if data.today_total == 0:
+        lines.append("No costs incurred today")
+    else:
+        lines.append(f"Today's Total: 💵 {today_text}")
+    lines.append(f"📅 {config.window_days}-DAY COST BREAKDOWN\n{start} - {today}")
+    amounts = currency_table.format_column([cost for _, cost in data.services], currencies)
+    for (service, _), amount in zip(data.services, amounts):
+        lines.append(f"📌 {service} - 💵 {amount}")
+    lines.append(f"\n💰 Monthly Total: 💵 {total_text}")
+    lines.append("\n📋 SUMMARY")
+    lines.append(f"📅 Today's Spending - 💵 {today_text}")
+    lines.append(f"📊 Last {config.window_days} Days Total - 💵 {total_text}")
+    return "\n".join(lines)
+
+
+def render_delta(changes, services, currency_table, currencies, title=None):
+    """
+    Short update listing only the services that changed materially since the last posted report
+    """
+    message = f"📊 *{title}* - Cost update\n\n" if title else "📊 Cost update\n\n"
+    message += "*🔀 Changes since the last report*\n"
+    amounts = currency_table.format_column([change.current for change in changes], currencies)
+    for change, amount in zip(changes, amounts):
+        arrow = "🔺" if change.delta > 0 else "🔻"
+        percent = f" ({change.percent:+,.0f}%)" if change.percent is not None else " (new)"
+        message += f"{arrow} {change.service} - now 💵{amount}{percent}\n"
+    total = currency_table.format(sum(cost for _, cost in services), currencies)
+    message += f"\n*Service Total:* 💵{total}\n"
+    return message
+
+
+def render_breakdown(group, totals, currency_table, currencies, days=30):
+    """
+    (value, cost) pairs for a dimension, tag or cost category grouping
+    """
+    message = f"📊 *Last {days} days by {group}*\n\n"
+    if not totals:
+        return message + "No costs incurred in this period 📉\n"
+    amounts = currency_table.format_column([cost for _, cost in totals], currencies)
+    for (value, _), amount in zip(totals, amounts):
+        message += f"▹ {value or '(untagged)'} - 💵{amount}\n"
+    message += f"\n*Total:* 💵{currency_table.format(sum(cost for _, cost in totals), currencies)}\n"
+    return message
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import os
+from collections import namedtuple
+
+from cache import get_cache, make_key
+from money import CENT, div_round, parse_micros
+
+logger = logging.getLogger()
+
+# Decisions for a scheduled report
+SKIP = "skip"
+DELTA = "delta"
+FULL = "full"
+
+# The last posted snapshot is compared against for this long
+SNAPSHOT_TTL = 35 * 24 * 3600
+
+# Example REPORT_DIFF value:
+# {"min_change": 1, "min_percent": 5, "full_percent": 20, "max_delta_lines": 10}
+# A service has changed materially when it moved by at least min_change dollars and min_percent
+# percent since the last posted report. Material changes are posted as a short delta, or as the
+# full report once the total moved by full_percent or more than max_delta_lines services changed.
+# {"enabled": false} posts the full report every time.
+DEFAULT_THRESHOLDS = {
+    "enabled": True,
+    "min_change": 1,
+    "min_percent": 5,
+    "full_percent": 20,
+    "max_delta_lines": 10,
+}
+
+# Amounts in micro-dollars, percent None for services absent from the previous report
+Change = namedtuple('Change', 'service previous current delta percent')
+Decision = namedtuple('Decision', 'action changes fingerprint')
+
+
+def load_diff_thresholds():
+    """
+    Read thresholds from REPORT_DIFF (JSON) over the defaults
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    raw = os.environ.get("REPORT_DIFF")
+    if raw:
+        thresholds.update(json.loads(raw))
+    return thresholds
+
+
+def fingerprint(services):
+    """
+    Compact snapshot of a report's aggregates: cents per service plus a short hash of them,
+    so an unchanged report is recognised with one string comparison
+    """
+    cents = {service: div_round(micros, CENT) for service, micros in services}
+    digest = hashlib.blake2b(digest_size=8)
+    for service in sorted(cents):
+        digest.update(f"{service}\0{cents[service]}\n".encode())
+    return {'hash': digest.hexdigest(), 'cents': cents}
+
+
+class ReportDiffer:
+    """
+    Decide per destination whether a report is worth posting, from its aggregates alone, so
+    unchanged reports are neither rendered nor posted
+    """
+
+    def __init__(self, thresholds=None, cache=None):
+        thresholds = thresholds or load_diff_thresholds()
+        self.enabled = thresholds.get("enabled", True)
+        self.min_change = parse_micros(str(thresholds["min_change"]))
+        self.min_percent = float(thresholds["min_percent"])
+        self.full_percent = float(thresholds["full_percent"])
+        self.max_delta_lines = int(thresholds["max_delta_lines"])
+        self.cache = cache
+
+    def _cache(self):
+        return self.cache or get_cache()
+
+    def decide(self, key, services):
+        """
+        Compare (service, micro-dollar cost) pairs with the snapshot last committed for key
+        """
+        current = fingerprint(services)
+        if not self.enabled:
+            return Decision(FULL, [], current)
+        previous = self._cache().get(make_key("report-snapshot", key))
+        if previous is None:
+            return Decision(FULL, [], current)
+        if previous['hash'] == current['hash']:
+            logger.info(f"Report for {key} is unchanged")
+            return Decision(SKIP, [], current)
+
+        before, after = previous['cents'], current['cents']
+        changes = []
+        for service in before.keys() | after.keys():
+            old, new = before.get(service, 0) * CENT, after.get(service, 0) * CENT
+            delta = new - old
+            if abs(delta) < self.min_change:
+                continue
+            percent = delta * 100 / old if old else None
+            if percent is not None and abs(percent) < self.min_percent:
+                continue
+            changes.append(Change(service, old, new, delta, percent))
+        changes.sort(key=lambda change: abs(change.delta), reverse=True)
+
+        if not changes:
+            logger.info(f"Report for {key} has no material change")
+            return Decision(SKIP, [], current)
+        old_total, new_total = sum(before.values()) * CENT, sum(after.values()) * CENT
+        total_percent = abs(new_total - old_total) * 100 / old_total if old_total else 100
+        if total_percent >= self.full_percent or len(changes) > self.max_delta_lines:
+            return Decision(FULL, changes, current)
+        return Decision(DELTA, changes, current)
+
+    def commit(self, key, snapshot):
+        """
+        Record the snapshot of a report that was posted. Skipped reports are not committed, so
+        small changes accumulate until they become material.
+        """
+        self._cache().set(make_key("report-snapshot", key), snapshot, SNAPSHOT_TTL)
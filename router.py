@@ -0,0 +1,93 @@
+import json
+import logging
+
+logger = logging.getLogger()
+
+# Route names
+TASK_PREFIX = "task:"
+URL_VERIFICATION = "url_verification"
+SCHEDULED = "scheduled"
+MANUAL = "manual"
+SLACK = "slack"
+UNSUPPORTED = "unsupported"
+
+MANUAL_PATH = "/slack-events"
+SIGNATURE_HEADERS = ("X-Slack-Signature", "x-slack-signature")
+
+
+def _is_slack_request(headers):
+    for name in SIGNATURE_HEADERS:
+        if name in headers:
+            return True
+    return any(name.lower() == "x-slack-signature" for name in headers)
+
+
+def classify(event):
+    """
+    Return (route name, parsed JSON body or None) using key lookups, parsing the body at most once
+    """
+    if not isinstance(event, dict):
+        return UNSUPPORTED, None
+
+    # EventBridge rules with constant input {"task": "..."}
+    task = event.get("task")
+    if task is not None:
+        return TASK_PREFIX + task, None
+
+    if event.get("source") == "aws.events" or event.get("detail-type") == "Scheduled Event":
+        return SCHEDULED, None
+
+    raw_body = event.get("body")
+    if raw_body is not None:
+        body = raw_body
+        # Only the verification challenge needs the body here, and a substring test rules it out
+        # without parsing; Bolt reads the raw body itself for every other Slack request
+        if isinstance(raw_body, str):
+            body = None
+            is_json = raw_body.lstrip()[:1] == "{" and not event.get("isBase64Encoded")
+            if is_json and "url_verification" in raw_body:
+                body = json.loads(raw_body)
+        if isinstance(body, dict) and body.get("type") == "url_verification":
+            return URL_VERIFICATION, body
+        headers = event.get("headers") or {}
+        if _is_slack_request(headers):
+            return SLACK, None
+        # Slash commands and interactions are form encoded
+        if isinstance(raw_body, str) and headers and raw_body.lstrip()[:1] != "{":
+            return SLACK, None
+
+    if event.get("path") == MANUAL_PATH:
+        return MANUAL, None
+    if raw_body is not None and "headers" in event:
+        return SLACK, None
+    return UNSUPPORTED, None
+
+
+class EventRouter:
+    """
+    Dispatch table from route name to handler(event, context, body)
+    """
+
+    def __init__(self):
+        self.routes = {}
+
+    def route(self, name):
+        def register(handler):
+            self.routes[name] = handler
+            return handler
+        return register
+
+    def task(self, name):
+        return self.route(TASK_PREFIX + name)
+
+    def dispatch(self, event, context):
+        name, body = classify(event)
+        handler = self.routes.get(name)
+        if handler is None:
+            logger.warning(f"Received unsupported event type: {event}")
+            return {
+                'statusCode': 400,
+                'body': json.dumps('Unsupported event type')
+            }
+        logger.info(f"Routing event to {name}")
+        return handler(event, context, body)
@@ -0,0 +1,85 @@
+import logging
+import re
+
+from currency import get_currency_table
+from http_client import DEFAULT_TIMEOUT, get_session
+
+logger = logging.getLogger()
+
+ACK_TEXT = "⏳ Crunching the AWS bill, it will show up here shortly..."
+CURRENCY_CODE = re.compile(r"^[A-Za-z]{3}$")
+USAGE = "Usage: `/bills [public] [by <grouping>] [INR EUR ...]`"
+
+
+def parse_bills_args(text, currency_table=None):
+    """
+    Parse "/bills [public] [by <grouping>] [INR EUR ...]" into
+    (response_type, currencies or None, grouping or None), e.g. "/bills by tag:team".
+    Currency codes are checked against currency_table when given; a code it has no rate for
+    raises ValueError with the usage.
+    """
+    response_type = "ephemeral"
+    currencies = []
+    unknown = []
+    group = None
+    words = iter(re.split(r"[\s,]+", (text or "").strip()))
+    for word in words:
+        if not word:
+            continue
+        if word.lower() == "by":
+            group = next(words, None) or None
+        elif word.lower() in ("public", "here", "channel"):
+            response_type = "in_channel"
+        elif CURRENCY_CODE.match(word):
+            if currency_table is None or currency_table.has_rate(word):
+                currencies.append(word.upper())
+            else:
+                unknown.append(word.upper())
+    if unknown:
+        raise ValueError(f"Unknown currency: {', '.join(unknown)}. {USAGE}")
+    return response_type, currencies or None, group
+
+
+def post_to_response_url(response_url, text, response_type="ephemeral"):
+    """
+    Deliver a deferred reply through the slash command's response_url on the pooled session
+    """
+    response = get_session().post(
+        response_url,
+        json={'response_type': response_type, 'replace_original': False, 'text': text},
+        timeout=DEFAULT_TIMEOUT
+    )
+    if response.status_code != 200:
+        logger.error(f"Error posting to response_url: {response.status_code}, {response.text}")
+    return response.status_code == 200
+
+
+def register_bills_command(app, build_report, command="/bills", build_breakdown=None):
+    """
+    Register the slash command on the Bolt app. The ack returns immediately and the report is
+    built by a lazy listener, which Bolt runs in a separate async Lambda invocation, so slow
+    Cost Explorer queries never hit Slack's 3 second timeout.
+    build_breakdown(grouping, currencies) answers "/bills by <grouping>" when given.
+    """
+
+    def ack_bills(ack):
+        ack(ACK_TEXT)
+
+    def send_bills(body):
+        response_type = "ephemeral"
+        logger.info(f"Building deferred {command} report for user {body.get('user_id')}")
+        try:
+            response_type, currencies, group = parse_bills_args(body.get("text"), get_currency_table())
+            if group and build_breakdown is not None:
+                message = build_breakdown(group, currencies)
+            else:
+                message = build_report(currencies)
+        except ValueError as e:
+            # Unknown currencies carry the usage, unknown groupings suggestions from the catalog
+            message = f"⚠️ {str(e)}"
+        except Exception as e:
+            logger.error(f"Error building {command} report: {str(e)}", exc_info=True)
+            message = f"❌ *An unexpected error occurred:* {str(e)}"
+        post_to_response_url(body["response_url"], message, response_type)
+
+    app.command(command)(ack=ack_bills, lazy=[send_bills])
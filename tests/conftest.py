@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "python")]
+# Keep the cost store and caches out of the real cache directory
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="billing-tests-")
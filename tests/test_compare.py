@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+import pytest
+
+from compare import month_over_month
+from cost_store import CostStore, epoch_day
+
+
+def _store(first, last, micros):
+    store = CostStore()
+    day = first
+    while day <= last:
+        store.set_daily("AmazonEC2", epoch_day(day), micros(day))
+        day += timedelta(days=1)
+    return store
+
+
+@pytest.mark.parametrize("today, prior_days", [
+    (date(2026, 3, 29), 28),
+    (date(2026, 3, 30), 28),
+    (date(2026, 3, 31), 28),
+    (date(2028, 3, 29), 28),
+    (date(2028, 3, 30), 29),
+    (date(2028, 3, 31), 29),
+])
+def test_month_over_month_prior_window_stays_in_previous_month(today, prior_days):
+    # One micro-dollar a day in February, a thousand in March, so any March day in the prior
+    # window shows up in its total
+    store = _store(
+        today.replace(month=2, day=1), today,
+        lambda day: 1 if day.month == 2 else 1000
+    )
+    comparison = month_over_month(store, today)
+    assert list(comparison.prior) == [prior_days]
+    assert list(comparison.current) == [1000 * (today.day - 1)]
@@ -0,0 +1,31 @@
+from datetime import date, timedelta
+
+from cost_store import CostStore, ensure_daily_history
+
+
+class FakeCostExplorer:
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.calls = []
+
+    def get_cost_and_usage(self, **kwargs):
+        self.calls.append(kwargs)
+        return {'ResultsByTime': self.results}
+
+
+def test_ensure_daily_history_remembers_empty_backfill():
+    store = CostStore()
+    today = date(2026, 3, 31)
+    window_start = today - timedelta(days=7)
+    store.ingest_daily_rows([(window_start.isoformat(), ["AmazonEC2"], 5_000_000)])
+    history_start = today - timedelta(days=45)
+    ce_client = FakeCostExplorer()
+
+    assert ensure_daily_history(ce_client, history_start, store) == 0
+    assert [call['TimePeriod'] for call in ce_client.calls] == [
+        {'Start': history_start.isoformat(), 'End': window_start.isoformat()}
+    ]
+
+    ensure_daily_history(ce_client, history_start, store)
+    ensure_daily_history(ce_client, history_start, CostStore.load())
+    assert len(ce_client.calls) == 1
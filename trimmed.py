@@ -6,8 +6,18 @@ from slack_bolt import App
 from slack_bolt.adapter.aws_lambda import SlackRequestHandler
 from dotenv import load_dotenv
 import os
-import requests
-from datetime import datetime, timedelta
+from currency import get_currency_table, report_currencies
+from budgets import BudgetMonitor, ingest_daily_costs, load_budget_rules
+from costs import on_ingest
+from catalog import breakdown
+from cost_store import ingest_hourly, record_daily_rows
+from fanout import fan_out, load_fanout_config
+from pipeline import ReportPipeline, load_report_config
+from renderers import render_breakdown, render_delta
+from report_diff import DELTA, SKIP, ReportDiffer
+from router import MANUAL, SCHEDULED, SLACK, URL_VERIFICATION, EventRouter
+from slash import register_bills_command
+from warmup import should_warm_on_init, warm_all
 
 # Configure logging
 logger = logging.getLogger()
@@ -18,6 +28,10 @@ load_dotenv()
 # Slack configurations
 bot_token = os.environ.get("SLACK_BOT_TOKEN")
 CHANNEL_ID = os.environ.get("SLACK_CHANNEL_ID")
+BUDGET_CHANNEL_ID = os.environ.get("BUDGET_CHANNEL_ID", CHANNEL_ID)
+
+# Rendered reports are reused across invocations and instances for this long
+REPORT_CACHE_TTL = int(os.environ.get("REPORT_CACHE_TTL", "900"))
 
 # Initialize AWS Cost Explorer client
 ce_client = boto3.client('ce')
@@ -31,104 +45,33 @@ app = App(
 
 handler = SlackRequestHandler(app)
 
-def get_usd_to_inr_rate():
-    try:
-        API_KEY = os.environ.get("ALPHA_VANTAGE_API_KEY")
-        url = f'https://www.alphavantage.co/query?function=CURRENCY_EXCHANGE_RATE&from_currency=USD&to_currency=INR&apikey={API_KEY}'
-        response = requests.get(url)
-        data = response.json()
-        rate = float(data['Realtime Currency Exchange Rate']['5. Exchange Rate'])
-        logger.info(f"Successfully fetched USD to INR rate: {rate}")
-        return rate
-    except Exception as e:
-        logger.error(f"Error fetching exchange rate: {str(e)}", exc_info=True)
-        return 83.34  # Fallback rate if API fails
+# Bill cycle report with the example $1.39 tax unless REPORT_TAX / REPORT_STYLE say otherwise
+report_pipeline = ReportPipeline(
+    ce_client, load_report_config(style="bill_cycle", tax="1.39"), cache_ttl=REPORT_CACHE_TTL
+)
 
-def get_aws_costs():
-    try:
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=30)
-        
-        logger.info(f"Fetching AWS costs for period: {start_date} to {end_date}")
-        
-        usd_to_inr = get_usd_to_inr_rate()
-        logger.info(f"Using USD to INR rate: {usd_to_inr}")
-        
-        logger.info("Fetching today's costs from AWS Cost Explorer")
-        today_response = ce_client.get_cost_and_usage(
-            TimePeriod={
-                'Start': end_date.strftime('%Y-%m-%d'),
-                'End': (end_date + timedelta(days=1)).strftime('%Y-%m-%d')
-            },
-            Granularity='DAILY',
-            Metrics=['UnblendedCost'],
-            GroupBy=[
-                {'Type': 'DIMENSION', 'Key': 'SERVICE'}
-            ]
-        )
-        
-        # Get monthly costs
-        logger.info("Fetching monthly costs from AWS Cost Explorer")
-        monthly_response = ce_client.get_cost_and_usage(
-            TimePeriod={
-                'Start': start_date.strftime('%Y-%m-%d'),
-                'End': end_date.strftime('%Y-%m-%d')
-            },
-            Granularity='MONTHLY',
-            Metrics=['UnblendedCost'],
-            GroupBy=[
-                {'Type': 'DIMENSION', 'Key': 'SERVICE'}
-            ]
-        )
-        
-        # Format the header with larger text
-        day_name = end_date.strftime('%A')
-        message = f"📊 *{end_date.strftime('%B')}* Month Bill Cycle\n\n"
+# Per-team channels for scheduled reports, falls back to SLACK_CHANNEL_ID when unset
+fanout_config = load_fanout_config()
 
-        # Monthly costs section
-        monthly_total = 0
-        monthly_services = []
-        
-        for result in monthly_response['ResultsByTime']:
-            for group in result['Groups']:
-                service = group['Keys'][0]
-                cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                if cost > 0:
-                    monthly_total += cost
-                    monthly_services.append((service, cost))
-        
-        # Sort and display monthly services
-        if monthly_services:
-            monthly_services.sort(key=lambda x: x[1], reverse=True)
-            message += "*📅 Services utilised*\n"
-            for service, cost in monthly_services:
-                inr_cost = cost * usd_to_inr
-                logger.debug(f"Monthly cost for {service}: USD {cost:.2f}, INR {inr_cost:.2f}")
-                message += f"▹ {service} - 💵${cost:,.2f} (₹{inr_cost:,.2f})\n"
-        else:
-            message += "*📅 Monthly Service Breakdown*\nNo costs incurred in this period 📉\n"
-        
-        monthly_total_inr = monthly_total * usd_to_inr
-        logger.info(f"Monthly total cost: USD {monthly_total:.2f}, INR {monthly_total_inr:.2f}")
-        # message += f"\n*Service Total:* 💵${monthly_total:,.2f} (₹{monthly_total_inr:,.2f})\n\n"
-        
-        # Tax section (assuming tax is calculated as a fixed amount or a percentage)
-        tax_amount = 1.39  # Example tax amount in USD
-        tax_inr = tax_amount * usd_to_inr
-        # message += f"▹ Tax - 💵${tax_amount:,.2f} (₹{tax_inr:,.2f})\n"
-        
-        # Total with tax
-        total_with_tax = monthly_total + tax_amount
-        total_with_tax_inr = total_with_tax * usd_to_inr
-        # message += f"\n*Total with Tax:* 💵${total_with_tax:,.2f} (₹{total_with_tax_inr:,.2f})\n\n"
-        
-        # Summary section
-        message += "\n*📌 SUMMARY*\n"
-        message += f"\n*Service Total:* 💵${monthly_total:,.2f} (₹{monthly_total_inr:,.2f})"
-        message += f"\n▹ Tax - 💵${tax_amount:,.2f} (₹{tax_inr:,.2f})\n"
-        message += f"▹ *Total Cost incurred till last bill cycle* - 💵${total_with_tax:,.2f} (₹{total_with_tax_inr:,.2f})\n"
-        
-        return message
+# Scheduled reports are only posted when costs changed materially since the last one
+report_differ = ReportDiffer()
+
+# Budget rules are evaluated whenever fresh daily costs land in the cache
+budget_monitor = BudgetMonitor(
+    load_budget_rules(),
+    lambda text: app.client.chat_postMessage(channel=BUDGET_CHANNEL_ID, text=text)
+)
+on_ingest(budget_monitor.on_ingest)
+# Fresh daily costs also land in the local cost store used for comparisons
+on_ingest(record_daily_rows)
+
+# Provisioned instances open their connections during init, before the first request arrives
+if should_warm_on_init():
+    warm_all(ce_client, app.client)
+
+def get_aws_costs(currencies=None):
+    try:
+        return report_pipeline.run(currencies)
         
     except ClientError as e:
         logger.error(f"AWS Cost Explorer API error: {str(e)}", exc_info=True)
@@ -149,6 +92,116 @@ def handle_mention(event, say):
         logger.info("Generic greeting requested via mention")
         say(f"Hey <@{event['user']}>!")
 
+def render_channel_report(services, currencies=None, title=None):
+    return report_pipeline.render_services(services, currencies, title)
+
+def render_channel_delta(changes, services, currencies=None, title=None):
+    return render_delta(changes, services, get_currency_table(), currencies or report_currencies(), title)
+
+def get_cost_breakdown(group, currencies=None):
+    """
+    Last 30 days of costs grouped by a dimension, tag ("tag:team") or cost category
+    """
+    totals = breakdown(ce_client, group)
+    return render_breakdown(group, totals, get_currency_table(), currencies or report_currencies())
+
+# /bills acks immediately and delivers the report through response_url
+register_bills_command(app, get_aws_costs, build_breakdown=get_cost_breakdown)
+
+# Event routes, see router.classify for how an event is matched
+router = EventRouter()
+
+@router.route(URL_VERIFICATION)
+def handle_url_verification(event, context, body):
+    logger.info("Handling Slack URL verification challenge")
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'challenge': body['challenge']})
+    }
+
+@router.route(SLACK)
+def handle_slack_request(event, context, body):
+    # Bolt re-reads the raw body as it must verify the request signature against it
+    logger.info("Processing Slack request via API Gateway")
+    return handler.handle(event, context)
+
+@router.task("budget-check")
+def handle_budget_check(event, context, body):
+    logger.info("Processing scheduled budget check")
+    ingest_daily_costs(ce_client)
+    return {
+        'statusCode': 200,
+        'body': json.dumps('Budget check completed')
+    }
+
+@router.task("hourly-ingest")
+def handle_hourly_ingest(event, context, body):
+    logger.info("Processing scheduled hourly cost ingestion")
+    count = ingest_hourly(ce_client)
+    return {
+        'statusCode': 200,
+        'body': json.dumps(f'Ingested {count} hourly cost samples')
+    }
+
+@router.task("warmup")
+def handle_warmup(event, context, body):
+    # Keep-warm ping: establish connections once per container and return before any other work
+    timings = warm_all(ce_client, app.client)
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'warmed': bool(timings), 'timings_ms': timings})
+    }
+
+@router.route(SCHEDULED)
+def handle_scheduled_report(event, context, body):
+    logger.info("Processing scheduled event for daily cost report")
+    if fanout_config:
+        # One Cost Explorer query shared by every configured channel
+        results = fan_out(
+            ce_client, fanout_config, render_channel_report, differ=report_differ,
+            render_delta=render_channel_delta
+        )
+        failed = [channel for channel, error in results if error]
+        return {
+            'statusCode': 207 if failed else 200,
+            'body': json.dumps({'sent': len(results) - len(failed), 'failed': failed})
+        }
+    # Decide from the aggregates first, so an unchanged report is never rendered
+    data = report_pipeline.build()
+    decision = report_differ.decide(CHANNEL_ID, data.services)
+    if decision.action == SKIP:
+        return {
+            'statusCode': 200,
+            'body': json.dumps('No material cost changes, report skipped')
+        }
+    if decision.action == DELTA:
+        cost_message = render_channel_delta(decision.changes, data.services)
+    else:
+        cost_message = report_pipeline.render(data)
+    app.client.chat_postMessage(
+        channel=CHANNEL_ID,
+        text=cost_message
+    )
+    report_differ.commit(CHANNEL_ID, decision.fingerprint)
+    logger.info(f"Daily cost report sent successfully ({decision.action})")
+    return {
+        'statusCode': 200,
+        'body': json.dumps('Daily cost report sent successfully')
+    }
+
+@router.route(MANUAL)
+def handle_manual_report(event, context, body):
+    logger.info("Processing manual trigger for cost report")
+    cost_message = get_aws_costs()
+    app.client.chat_postMessage(
+        channel=CHANNEL_ID,
+        text=cost_message
+    )
+    return {
+        'statusCode': 200,
+        'body': json.dumps('Cost report sent successfully')
+    }
+
 def lambda_handler(event, context):
     """
     AWS Lambda handler function
@@ -156,61 +209,7 @@ def lambda_handler(event, context):
     logger.info(f"Received event: {json.dumps(event)}")
     
     try:
-        # Handle Slack URL verification challenge
-        if 'body' in event:
-            body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
-            if isinstance(body, dict) and body.get('type') == 'url_verification':
-                logger.info("Handling Slack URL verification challenge")
-                return {
-                    'statusCode': 200,
-                    'body': json.dumps({'challenge': body['challenge']})
-                }
-
-        # Handle scheduled event from EventBridge
-        if (
-            isinstance(event, dict) and 
-            (('source' in event and event['source'] == 'aws.events') or
-             ('detail-type' in event and event['detail-type'] == 'Scheduled Event'))
-        ):
-            logger.info("Processing scheduled event for daily cost report")
-            cost_message = get_aws_costs()
-            app.client.chat_postMessage(
-                channel=CHANNEL_ID,
-                text=cost_message
-            )
-            logger.info("Daily cost report sent successfully")
-            return {
-                'statusCode': 200,
-                'body': json.dumps('Daily cost report sent successfully')
-            }
-
-        # Handle manual trigger via /scheduled-report endpoint
-        elif (
-            isinstance(event, dict) and
-            'path' in event and 
-            event['path'] == '/slack-events'
-        ):
-            logger.info("Processing manual trigger for cost report")
-            cost_message = get_aws_costs()
-            app.client.chat_postMessage(
-                channel=CHANNEL_ID,
-                text=cost_message
-            )
-            return {
-                'statusCode': 200,
-                'body': json.dumps('Cost report sent successfully')
-            }
-
-        # Handle Slack events (these come through API Gateway)
-        elif 'body' in event and 'headers' in event:
-            logger.info("Processing Slack event via API Gateway")
-            return handler.handle(event, context)
-            
-        logger.warning(f"Received unsupported event type: {event}")
-        return {
-            'statusCode': 400,
-            'body': json.dumps('Unsupported event type')
-        }
+        return router.dispatch(event, context)
         
     except Exception as e:
         logger.error(f"Error in lambda_handler: {str(e)}", exc_info=True)
@@ -0,0 +1,88 @@
+import logging
+import os
+import time
+
+from http_client import DEFAULT_TIMEOUT, get_session
+
+logger = logging.getLogger()
+
+# Hosts the bot talks to over the shared requests session
+WARM_URLS = [
+    url.strip() for url in os.environ.get(
+        "WARM_URLS", "https://slack.com/api/api.test,https://hooks.slack.com/,https://v6.exchangerate-api.com/"
+    ).split(",") if url.strip()
+]
+
+_warmed = False
+
+
+def should_warm_on_init():
+    """
+    Warm during the init phase for provisioned concurrency, or when WARM_ON_INIT=1
+    """
+    return (
+        os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency"
+        or os.environ.get("WARM_ON_INIT") == "1"
+    )
+
+
+def _timed(timings, name, func):
+    started = time.perf_counter()
+    try:
+        func()
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    except Exception as e:
+        logger.warning(f"Warm-up of {name} failed: {str(e)}")
+        timings[name] = None
+
+
+def warm_http(urls=None, session=None, timings=None):
+    """
+    Open keep-alive TLS connections on the shared session, which also loads the CA bundle
+    """
+    session = session or get_session()
+    timings = {} if timings is None else timings
+    for url in urls or WARM_URLS:
+        _timed(timings, url, lambda: session.head(url, timeout=DEFAULT_TIMEOUT, allow_redirects=False).close())
+    return timings
+
+
+def warm_boto3(client, timings=None):
+    """
+    Resolve the endpoint and complete the TLS handshake on the client's own connection pool
+    with an unsigned request, which is rejected without invoking (or billing) any API
+    """
+    from botocore.awsrequest import AWSRequest
+
+    timings = {} if timings is None else timings
+    endpoint = client.meta.endpoint_url
+    http_session = client._endpoint.http_session
+    _timed(timings, endpoint, lambda: http_session.send(AWSRequest(method='GET', url=endpoint).prepare()))
+    return timings
+
+
+def warm_slack(client, timings=None):
+    """
+    Validate the bot token, which also primes DNS and the TLS context for slack.com
+    """
+    timings = {} if timings is None else timings
+    _timed(timings, "slack auth.test", lambda: client.auth_test())
+    return timings
+
+
+def warm_all(ce_client=None, slack_client=None, force=False):
+    """
+    Pre-establish every outbound connection once per execution environment
+    """
+    global _warmed
+    if _warmed and not force:
+        return {}
+    timings = {}
+    warm_http(timings=timings)
+    if ce_client is not None:
+        warm_boto3(ce_client, timings)
+    if slack_client is not None:
+        warm_slack(slack_client, timings)
+    _warmed = True
+    logger.info(f"Warm-up timings (ms): {timings}")
+    return timings